@@ -0,0 +1,57 @@
+"""add coverage index
+
+Revision ID: 0b7d4e2a6c91
+Revises: f5a1c3e9b2d4
+Create Date: 2026-10-18 13:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7d4e2a6c91'
+down_revision: Union[str, None] = 'f5a1c3e9b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('installation_coverage',
+    sa.Column('installation_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('covered', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['installation_id'], ['installations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('installation_id', 'date')
+    )
+    op.create_table('tenant_coverage',
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('covered', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'date')
+    )
+    # Índice inicial desde los turnos existentes (mismo cálculo que python -m app.services.coverage rebuild)
+    op.execute("""
+        INSERT INTO installation_coverage (installation_id, date, tenant_id, covered)
+        SELECT installation_id, date, tenant_id, count(*)
+        FROM shifts WHERE shift_type IN (1, 2)
+        GROUP BY installation_id, date, tenant_id
+    """)
+    op.execute("""
+        INSERT INTO tenant_coverage (tenant_id, date, covered)
+        SELECT c.tenant_id, c.date,
+               sum(CASE WHEN c.covered < i.required_guards THEN c.covered ELSE i.required_guards END)
+        FROM installation_coverage c
+        JOIN installations i ON i.id = c.installation_id AND i.is_active
+        GROUP BY c.tenant_id, c.date
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('tenant_coverage')
+    op.drop_table('installation_coverage')
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""add round events
+
+Revision ID: 4e8a6b2f0c15
+Revises: 9c4f2d7e1a38
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a6b2f0c15'
+down_revision: Union[str, None] = '9c4f2d7e1a38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # En PostgreSQL solo se crea la tabla padre: las particiones las crea la
+    # aplicación al iniciar (o python -m app.services.rounds ensure)
+    op.create_table('round_events',
+    sa.Column('installation_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event_id', sa.String(length=36), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('guard_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.SmallInteger(), nullable=False),
+    sa.Column('checkpoint', sa.String(length=64), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('accuracy', sa.Float(), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['guard_id'], ['guards.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['installation_id'], ['installations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('installation_id', 'recorded_at', 'event_id'),
+    postgresql_partition_by='RANGE (recorded_at)'
+    )
+    op.create_index('ix_round_events_recorded_at', 'round_events', ['recorded_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_round_events_recorded_at', table_name='round_events')
+    # Con particiones, DROP TABLE de la tabla padre elimina también las particiones
+    op.drop_table('round_events')
\ No newline at end of file
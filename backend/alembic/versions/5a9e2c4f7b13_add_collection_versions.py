@@ -0,0 +1,32 @@
+"""add collection versions
+
+Revision ID: 5a9e2c4f7b13
+Revises: d41c8e7b3f52
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9e2c4f7b13'
+down_revision: Union[str, None] = 'd41c8e7b3f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('collection_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO collection_versions (name, version, updated_at) VALUES ('tenants', 0, CURRENT_TIMESTAMP)")
+
+
+def downgrade() -> None:
+    op.drop_table('collection_versions')
\ No newline at end of file
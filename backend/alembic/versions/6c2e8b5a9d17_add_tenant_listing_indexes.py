@@ -0,0 +1,34 @@
+"""add tenant listing indexes
+
+Revision ID: 6c2e8b5a9d17
+Revises: 3f9a1c7d2b64
+Create Date: 2026-10-18 13:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2e8b5a9d17'
+down_revision: Union[str, None] = '3f9a1c7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Índices compuestos para paginación por cursor (keyset) en GET /tenants
+    op.create_index('ix_tenants_created_at_id', 'tenants', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tenants_name_id', 'tenants', ['name', 'id'], unique=False)
+    op.create_index('ix_tenants_is_active_created_at_id', 'tenants', ['is_active', 'created_at', 'id'], unique=False)
+    # Búsqueda por prefijo de nombre sin distinguir mayúsculas
+    op.create_index('ix_tenants_lower_name', 'tenants', [sa.text('lower(name) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tenants_lower_name', table_name='tenants')
+    op.drop_index('ix_tenants_is_active_created_at_id', table_name='tenants')
+    op.drop_index('ix_tenants_name_id', table_name='tenants')
+    op.drop_index('ix_tenants_created_at_id', table_name='tenants')
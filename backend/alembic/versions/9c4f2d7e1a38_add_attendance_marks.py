@@ -0,0 +1,50 @@
+"""add attendance marks
+
+Revision ID: 9c4f2d7e1a38
+Revises: 0b7d4e2a6c91
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f2d7e1a38'
+down_revision: Union[str, None] = '0b7d4e2a6c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('attendance_marks',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('client_mark_id', sa.String(length=36), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('guard_id', sa.Integer(), nullable=False),
+    sa.Column('installation_id', sa.Integer(), nullable=False),
+    sa.Column('mark_type', sa.SmallInteger(), nullable=False),
+    sa.Column('method', sa.String(length=16), nullable=False),
+    sa.Column('marked_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('submitted_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['guard_id'], ['guards.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['installation_id'], ['installations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['submitted_by'], ['users.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_attendance_marks_client_mark_id', 'attendance_marks', ['client_mark_id'], unique=True)
+    op.create_index('ix_attendance_marks_guard_id_marked_at', 'attendance_marks', ['guard_id', 'marked_at'], unique=False)
+    op.create_index('ix_attendance_marks_installation_id_marked_at', 'attendance_marks', ['installation_id', 'marked_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_marks_installation_id_marked_at', table_name='attendance_marks')
+    op.drop_index('ix_attendance_marks_guard_id_marked_at', table_name='attendance_marks')
+    op.drop_index('ix_attendance_marks_client_mark_id', table_name='attendance_marks')
+    op.drop_table('attendance_marks')
\ No newline at end of file
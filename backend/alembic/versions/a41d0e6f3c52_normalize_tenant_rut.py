@@ -0,0 +1,48 @@
+"""normalize tenant rut
+
+Revision ID: a41d0e6f3c52
+Revises: 6c2e8b5a9d17
+Create Date: 2026-10-18 13:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d0e6f3c52'
+down_revision: Union[str, None] = '6c2e8b5a9d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El RUT pasa a guardarse como cuerpo numérico + dígito verificador
+    op.add_column('tenants', sa.Column('rut_numero', sa.Integer(), nullable=True))
+    op.add_column('tenants', sa.Column('rut_dv', sa.String(length=1), nullable=True))
+    op.execute("""
+        UPDATE tenants
+        SET rut_numero = CAST(left(r.limpio, length(r.limpio) - 1) AS INTEGER),
+            rut_dv = right(r.limpio, 1)
+        FROM (
+            SELECT id, upper(regexp_replace(rut, '[^0-9Kk]', '', 'g')) AS limpio FROM tenants
+        ) AS r
+        WHERE tenants.id = r.id
+    """)
+    op.alter_column('tenants', 'rut_numero', nullable=False)
+    op.alter_column('tenants', 'rut_dv', nullable=False)
+    op.create_index('ix_tenants_rut_numero', 'tenants', ['rut_numero'], unique=True)
+    op.drop_constraint('tenants_rut_key', 'tenants', type_='unique')
+    op.drop_column('tenants', 'rut')
+
+
+def downgrade() -> None:
+    op.add_column('tenants', sa.Column('rut', sa.String(), nullable=True))
+    op.execute("UPDATE tenants SET rut = CAST(rut_numero AS VARCHAR) || rut_dv")
+    op.alter_column('tenants', 'rut', nullable=False)
+    op.create_unique_constraint('tenants_rut_key', 'tenants', ['rut'])
+    op.drop_index('ix_tenants_rut_numero', table_name='tenants')
+    op.drop_column('tenants', 'rut_dv')
+    op.drop_column('tenants', 'rut_numero')
@@ -0,0 +1,46 @@
+"""add audit logs
+
+Revision ID: b73e1f5d9a26
+Revises: 4e8a6b2f0c15
+Create Date: 2026-10-18 15:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b73e1f5d9a26'
+down_revision: Union[str, None] = '4e8a6b2f0c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('audit_logs',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('entry_id', sa.String(length=36), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=True),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('action', sa.String(length=16), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=True),
+    sa.Column('changes', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_logs_entry_id', 'audit_logs', ['entry_id'], unique=True)
+    op.create_index('ix_audit_logs_tenant_id_occurred_at', 'audit_logs', ['tenant_id', 'occurred_at'], unique=False)
+    op.create_index('ix_audit_logs_actor_id_occurred_at', 'audit_logs', ['actor_id', 'occurred_at'], unique=False)
+    op.create_index('ix_audit_logs_occurred_at', 'audit_logs', ['occurred_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_occurred_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_actor_id_occurred_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_tenant_id_occurred_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_entry_id', table_name='audit_logs')
+    op.drop_table('audit_logs')
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""add users email lower index
+
+Revision ID: d41c8e7b3f52
+Revises: b73e1f5d9a26
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c8e7b3f52'
+down_revision: Union[str, None] = 'b73e1f5d9a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Emails que solo difieren en mayúsculas impedirían crear el índice: se informan para resolverlos a mano
+    if not context.is_offline_mode():
+        duplicates = op.get_bind().execute(sa.text(
+            "SELECT lower(email) FROM users GROUP BY lower(email) HAVING count(*) > 1"
+        )).scalars().all()
+        if duplicates:
+            raise RuntimeError(f"Usuarios con el mismo email en distintas mayúsculas: {', '.join(duplicates)}")
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
\ No newline at end of file
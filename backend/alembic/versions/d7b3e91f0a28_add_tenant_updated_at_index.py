@@ -0,0 +1,27 @@
+"""add tenant updated_at index
+
+Revision ID: d7b3e91f0a28
+Revises: a41d0e6f3c52
+Create Date: 2026-10-18 13:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3e91f0a28'
+down_revision: Union[str, None] = 'a41d0e6f3c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # max(updated_at) para la versión del listado de tenants (ETag)
+    op.create_index('ix_tenants_updated_at', 'tenants', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tenants_updated_at', table_name='tenants')
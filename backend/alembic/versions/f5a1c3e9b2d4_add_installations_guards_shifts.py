@@ -0,0 +1,81 @@
+"""add installations, guards and shifts
+
+Revision ID: f5a1c3e9b2d4
+Revises: e2f84c1b7a90
+Create Date: 2026-10-18 13:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a1c3e9b2d4'
+down_revision: Union[str, None] = 'e2f84c1b7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('installations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('required_guards', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_installations_tenant_id_name', 'installations', ['tenant_id', 'name'], unique=False)
+
+    op.create_table('guards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('installation_id', sa.Integer(), nullable=True),
+    sa.Column('nombre', sa.String(), nullable=False),
+    sa.Column('apellido', sa.String(), nullable=False),
+    sa.Column('rut_numero', sa.Integer(), nullable=False),
+    sa.Column('rut_dv', sa.String(length=1), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['installation_id'], ['installations.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_guards_tenant_id_rut_numero', 'guards', ['tenant_id', 'rut_numero'], unique=True)
+    op.create_index('ix_guards_installation_id', 'guards', ['installation_id'], unique=False)
+
+    op.create_table('shifts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sa.Integer(), nullable=False),
+    sa.Column('installation_id', sa.Integer(), nullable=False),
+    sa.Column('guard_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('shift_type', sa.SmallInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['installation_id'], ['installations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['guard_id'], ['guards.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_shifts_guard_id_date', 'shifts', ['guard_id', 'date'], unique=True)
+    op.create_index('ix_shifts_installation_id_date', 'shifts', ['installation_id', 'date'], unique=False)
+    op.create_index('ix_shifts_tenant_id_date', 'shifts', ['tenant_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shifts_tenant_id_date', table_name='shifts')
+    op.drop_index('ix_shifts_installation_id_date', table_name='shifts')
+    op.drop_index('ix_shifts_guard_id_date', table_name='shifts')
+    op.drop_table('shifts')
+    op.drop_index('ix_guards_installation_id', table_name='guards')
+    op.drop_index('ix_guards_tenant_id_rut_numero', table_name='guards')
+    op.drop_table('guards')
+    op.drop_index('ix_installations_tenant_id_name', table_name='installations')
+    op.drop_table('installations')
\ No newline at end of file
@@ -1,12 +1,22 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from uuid import uuid4
 
+from app.core.cache import LocalCache
 from app.core.config import settings
+from app.core.keys import KEY_ALGORITHM, keyring, uses_asymmetric_keys
+from app.core.metrics import token_verify_duration
+from app.core.revocation import revocation_list
 from app.models.user import User
 
+# Payloads ya verificados, indexados por el digest del token y vigentes hasta su exp.
+# Siempre local al proceso: no tiene sentido compartir firmas ya verificadas.
+verified_token_cache = LocalCache(settings.TOKEN_CACHE_MAX_SIZE)
+
 class TokenManager:
     """
     Clase para manejar la generación y validación de tokens JWT
@@ -16,8 +26,9 @@ class TokenManager:
     def create_token(
         user: User,
         token_type: str = "access",
-        expires_delta: Optional[timedelta] = None
-    ) -> Dict[str, str]:
+        expires_delta: Optional[timedelta] = None,
+        extra_claims: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Crea un token JWT con claims específicos basados en el tipo de token
         """
@@ -25,7 +36,7 @@ class TokenManager:
             expires_delta = (
                 timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
                 if token_type == "access"
-                else timedelta(days=7)  # refresh token dura 7 días
+                else timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
             )
 
         # Claims estándar de JWT
@@ -39,46 +50,85 @@ class TokenManager:
             "is_active": user.is_active,
             "jti": str(uuid4())  # unique token ID
         }
+        if extra_claims:
+            to_encode.update(extra_claims)
 
         # Firma el token con el algoritmo especificado
-        encoded_jwt = jwt.encode(
-            to_encode,
-            settings.SECRET_KEY,
-            algorithm=settings.ALGORITHM
-        )
+        if uses_asymmetric_keys():
+            signing_key = keyring.signing_key()
+            encoded_jwt = jwt.encode(
+                to_encode,
+                signing_key.private_key,
+                algorithm=KEY_ALGORITHM,
+                headers={"kid": signing_key.kid}
+            )
+        else:
+            encoded_jwt = jwt.encode(
+                to_encode,
+                settings.SECRET_KEY,
+                algorithm=settings.ALGORITHM
+            )
 
         return {
             "token": encoded_jwt,
             "token_type": token_type,
-            "expires_in": int(expires_delta.total_seconds())
+            "expires_in": int(expires_delta.total_seconds()),
+            "jti": to_encode["jti"]
         }
 
     @staticmethod
-    def create_tokens(user: User) -> Dict[str, Any]:
+    def create_tokens(user: User, family_id: Optional[str] = None) -> Dict[str, Any]:
         """
-        Crea tanto el access token como el refresh token
+        Crea tanto el access token como el refresh token. El refresh token
+        lleva la familia de sesión (claim "fam"); sin family_id se abre una nueva
         """
+        family_id = family_id or str(uuid4())
         access_token = TokenManager.create_token(user, "access")
-        refresh_token = TokenManager.create_token(user, "refresh")
+        refresh_token = TokenManager.create_token(user, "refresh", extra_claims={"fam": family_id})
         
         return {
             "access_token": access_token["token"],
             "refresh_token": refresh_token["token"],
             "token_type": "bearer",
-            "expires_in": access_token["expires_in"]
+            "expires_in": access_token["expires_in"],
+            "refresh_jti": refresh_token["jti"],
+            "refresh_expires_in": refresh_token["expires_in"],
+            "family_id": family_id
         }
 
+    @staticmethod
+    def _decode(token: str) -> Dict[str, Any]:
+        """
+        Verifica la firma con la llave indicada por el kid del header; los
+        tokens sin kid son HS256 firmados con SECRET_KEY
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid:
+            key = keyring.verification_key(kid)
+            if key is None:
+                raise JWTError("Unknown signing key")
+            return jwt.decode(token, key.public_key, algorithms=[KEY_ALGORITHM])
+
+        if uses_asymmetric_keys():
+            if not settings.JWT_ACCEPT_LEGACY_HS256:
+                raise JWTError("Token without key id")
+            algorithms = ["HS256"]
+        else:
+            algorithms = [settings.ALGORITHM]
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=algorithms)
+
     @staticmethod
     def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
         """
         Verifica y decodifica un token JWT
         """
+        started = time.perf_counter()
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM]
-            )
+            token_digest = hashlib.sha256(token.encode()).hexdigest()
+            payload = verified_token_cache.get(token_digest)
+            if payload is None:
+                payload = TokenManager._decode(token)
+                verified_token_cache.set(token_digest, payload, payload.get("exp", 0) - time.time())
             
             # Verificaciones adicionales
             if payload.get("type") != token_type:
@@ -88,11 +138,15 @@ class TokenManager:
                     headers={"WWW-Authenticate": "Bearer"},
                 )
 
-            # Verificar si el token está en la lista negra (si implementas revocación)
-            # if is_token_revoked(payload.get("jti")):
-            #     raise HTTPException(...)
+            # Verificar si el token está en la lista negra
+            if revocation_list.is_revoked(payload.get("jti")):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
 
-            return payload
+            return dict(payload)
 
         except JWTError as e:
             raise HTTPException(
@@ -100,24 +154,5 @@ class TokenManager:
                 detail=f"Could not validate credentials: {str(e)}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-
-    @staticmethod
-    def refresh_access_token(refresh_token: str) -> Dict[str, str]:
-        """
-        Genera un nuevo access token usando un refresh token válido
-        """
-        payload = TokenManager.verify_token(refresh_token, "refresh")
-        
-        # Aquí deberías obtener el usuario de la base de datos
-        # user = get_user_by_id(payload.get("sub"))
-        # return TokenManager.create_token(user, "access")
-        
-        # Por ahora, solo devolvemos un nuevo token con los mismos claims
-        new_token = TokenManager.create_token({
-            "id": payload.get("sub"),
-            "email": payload.get("email"),
-            "is_superadmin": payload.get("is_superadmin"),
-            "is_active": payload.get("is_active")
-        }, "access")
-        
-        return new_token 
\ No newline at end of file
+        finally:
+            token_verify_duration.observe(time.perf_counter() - started)
\ No newline at end of file
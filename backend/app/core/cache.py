@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+from uuid import uuid4
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """
+    Interfaz mínima de cache clave/valor con TTL. get/set/delete son
+    síncronos y no salen del proceso: se usan en el camino de cada request
+    y desde eventos de SQLAlchemy.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class LocalCache(CacheBackend):
+    """
+    Cache LRU en memoria del proceso con expiración por entrada
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class RedisInvalidatedCache(LocalCache):
+    """
+    Cache en memoria del proceso (el request no sale a la red) cuyas
+    invalidaciones se reparten entre workers por Redis pub/sub (requiere el
+    paquete redis, ver requirements-redis.txt). La publicación y la escucha
+    corren en tareas de fondo; si Redis no responde, las entradas que otro
+    worker modificó caducan por TTL
+    """
+
+    def __init__(self, max_size: int, url: str, prefix: str):
+        super().__init__(max_size)
+        self._url = url
+        self._channel = f"cache:{prefix}:invalidate"
+        # Identifica a este worker para ignorar sus propios mensajes
+        self._origin = uuid4().hex
+        # Claves a invalidar en los demás workers (None: todas)
+        self._outbox: Deque[Optional[str]] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    def delete(self, key: str) -> None:
+        super().delete(key)
+        self._publish(key)
+
+    def clear(self) -> None:
+        super().clear()
+        self._publish(None)
+
+    def _publish(self, key: Optional[str]) -> None:
+        # Puede llamarse desde eventos síncronos de SQLAlchemy: solo encola
+        if self._loop is None:
+            return
+        self._outbox.append(key)
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        import redis.asyncio as redis
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._publisher = redis.Redis.from_url(
+            self._url,
+            socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+        )
+        # Sin socket_timeout: la suscripción pasa la mayor parte del tiempo esperando
+        self._subscriber = redis.Redis.from_url(self._url, socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS)
+        self._tasks = [asyncio.create_task(self._publish_loop()), asyncio.create_task(self._listen())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._loop is not None:
+            self._loop = None
+            await self._publisher.aclose()
+            await self._subscriber.aclose()
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._outbox:
+                key = self._outbox.popleft()
+                try:
+                    await self._publisher.publish(self._channel, json.dumps({"origin": self._origin, "key": key}))
+                    self.published += 1
+                except Exception:
+                    self.errors += 1
+                    logger.exception("Error publicando invalidación de cache en Redis")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._subscriber.pubsub()
+                await pubsub.subscribe(self._channel)
+                async for event in pubsub.listen():
+                    if event["type"] != "message":
+                        continue
+                    message = json.loads(event["data"])
+                    if message["origin"] == self._origin:
+                        continue
+                    self.received += 1
+                    if message["key"] is None:
+                        LocalCache.clear(self)
+                    else:
+                        LocalCache.delete(self, message["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception("Error escuchando invalidaciones de cache en Redis, reintentando")
+                await asyncio.sleep(1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "invalidations_published": self.published,
+            "invalidations_received": self.received,
+            "redis_errors": self.errors,
+        }
+
+
+def create_cache(prefix: str, max_size: int) -> CacheBackend:
+    """
+    Crea el backend configurado en CACHE_BACKEND ("local" o "redis")
+    """
+    if settings.CACHE_BACKEND == "redis":
+        return RedisInvalidatedCache(max_size, settings.REDIS_URL, prefix)
+    return LocalCache(max_size)
\ No newline at end of file
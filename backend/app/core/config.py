@@ -1,6 +1,7 @@
 from typing import List
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, validator
+from sqlalchemy.engine import make_url
 import re
 
 class Settings(BaseSettings):
@@ -25,16 +26,125 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+
+    # Pool de conexiones (DB_USE_NULL_POOL=True para PgBouncer en modo transacción)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_USE_NULL_POOL: bool = False
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """
+        Deriva la URL del driver asíncrono a partir de DATABASE_URL
+        (asyncpg para Postgres, aiosqlite para SQLite)
+        """
+        url = make_url(self.DATABASE_URL)
+        if url.drivername in ("postgres", "postgresql", "postgresql+psycopg2"):
+            # asyncpg no entiende sslmode/channel_binding de libpq
+            query = dict(url.query)
+            sslmode = query.pop("sslmode", None)
+            query.pop("channel_binding", None)
+            if sslmode:
+                query["ssl"] = sslmode
+            url = url.set(drivername="postgresql+asyncpg", query=query)
+        elif url.drivername == "sqlite":
+            url = url.set(drivername="sqlite+aiosqlite")
+        return url.render_as_string(hide_password=False)
+    
+    # Profiler de SQL por request (opt-in)
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_SLOW_QUERY_MS: int = 200
+    SQL_PROFILER_EXPLAIN: bool = False
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    
+    # Listados: columnas como tuplas + orjson, sin validar la salida con Pydantic
+    FAST_LIST_SERIALIZATION: bool = True
+
+    # Pauta mensual: celdas modificadas por sentencia al guardar
+    ROSTER_SAVE_BATCH: int = 1000
+
+    # Marcaciones: group commit de hasta BATCH_SIZE marcaciones o FLUSH_MS de espera
+    ATTENDANCE_BATCH_SIZE: int = 500
+    ATTENDANCE_FLUSH_MS: int = 10
+    ATTENDANCE_MAX_QUEUE: int = 10000
+    ATTENDANCE_WRITERS: int = 2
+
+    # Rondas: particiones de round_events por "month" o "day" (solo PostgreSQL)
+    ROUND_PARTITION_INTERVAL: str = "month"
+    ROUND_PARTITIONS_AHEAD: int = 2
+    ROUND_RETENTION_DAYS: int = 365
+    # Rango máximo de una consulta de eventos por instalación
+    ROUND_QUERY_MAX_DAYS: int = 31
+
+    # Auditoría: writer en segundo plano y spool local si la base no responde
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_MS: int = 1000
+    AUDIT_MAX_BUFFER: int = 10000
+    AUDIT_SPOOL_DIR: str = "audit_spool"
+    AUDIT_SPOOL_MAX_BYTES: int = 50_000_000
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Filas de refresh_sessions expiradas borradas por sentencia en la limpieza
+    REFRESH_SESSION_PURGE_BATCH: int = 1000
+    # Firma asimétrica: ALGORITHM=ES256 usa las llaves de JWT_KEYS_DIR (ver app/core/keys.py)
+    JWT_KEYS_DIR: str = "jwt_keys"
+    JWT_KEY_ROTATION_DAYS: int = 30
+    # Debe superar JWKS_CACHE_SECONDS: los verificadores conocen la llave antes de que firme
+    JWT_KEY_ACTIVATION_SECONDS: int = 900
+    JWKS_CACHE_SECONDS: int = 300
+    # Con ES256, sigue aceptando tokens HS256 (sin kid) mientras dura la migración
+    JWT_ACCEPT_LEGACY_HS256: bool = True
+
+    # Password hashing (bcrypt) - pool dedicado y cola acotada
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    
+    # Límite de intentos en login/signup (token bucket por IP y por cuenta, por período)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "local"
+    RATE_LIMIT_PERIOD_SECONDS: int = 60
+    RATE_LIMIT_LOGIN_PER_IP: int = 20
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: int = 10
+    RATE_LIMIT_SIGNUP_PER_IP: int = 5
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Detrás de un proxy: usar la IP que agrega en X-Forwarded-For
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    
+    # Cache en memoria del proceso; con redis, las invalidaciones se reparten entre workers
+    CACHE_BACKEND: str = "local"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Timeout de conexión y de cada comando: con Redis caído, los requests no esperan más que esto
+    REDIS_TIMEOUT_SECONDS: float = 0.2
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+
+    # Revocación de tokens: intervalo de sincronización entre workers
+    REVOCATION_SYNC_SECONDS: int = 5
+
+    # Tiempo real (WebSocket): pub/sub local o redis; límites por cliente
+    REALTIME_BACKEND: str = "local"
+    REALTIME_MAX_PENDING: int = 256
+    REALTIME_MAX_BATCH: int = 100
+    REALTIME_SEND_TIMEOUT_SECONDS: float = 5.0
     
     # First superadmin
     FIRST_SUPERADMIN_EMAIL: str
     FIRST_SUPERADMIN_PASSWORD: str
     
+    # Arranque: FAST_STARTUP omite create_all si Alembic está en el head y no
+    # crea el superadmin (usar python -m app.db.init_db)
+    FAST_STARTUP: bool = False
+    STARTUP_PREFILL_CONNECTIONS: int = 5
+    
     # Debug - Forzar False en producción
     DEBUG: bool = False
     
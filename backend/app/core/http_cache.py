@@ -0,0 +1,52 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    ETag débil a partir de los valores que determinan la representación
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Compara If-None-Match con el ETag actual (comparación débil)
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == current for candidate in header.split(","))
+
+
+def http_date(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    # SQLite devuelve datetimes naive: se asumen en UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    modified = http_date(last_modified)
+    if modified:
+        response.headers["Last-Modified"] = modified
+
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, last_modified)
+    return response
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Llaves asimétricas para firmar JWT (ES256).
+
+Cada llave es un PEM en JWT_KEYS_DIR llamado <kid>.pem, donde el kid empieza
+con la fecha de creación. Todas las llaves vigentes se publican en el JWKS;
+una llave nueva solo se usa para firmar después de JWT_KEY_ACTIVATION_SECONDS,
+para que los servicios que cachean el JWKS la conozcan antes de ver tokens
+firmados con ella. El directorio debe ser compartido por todas las instancias.
+
+Uso:
+    python -m app.core.keys generate   # crea una llave nueva
+    python -m app.core.keys rotate     # crea una si la activa cumplió JWT_KEY_ROTATION_DAYS y poda retiradas
+    python -m app.core.keys list
+"""
+import asyncio
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose.backends import ECKey
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_ALGORITHM = "ES256"
+# Intervalo mínimo entre revisiones del directorio en el camino de firma
+_REFRESH_INTERVAL_SECONDS = 5
+_KID_TIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    created_at: datetime
+    private_key: ECKey
+    public_key: ECKey
+
+    @property
+    def activates_at(self) -> datetime:
+        return self.created_at + timedelta(seconds=settings.JWT_KEY_ACTIVATION_SECONDS)
+
+    def public_jwk(self) -> Dict[str, Any]:
+        jwk = self.public_key.to_dict()
+        jwk.update(kid=self.kid, use="sig", alg=KEY_ALGORITHM)
+        return jwk
+
+
+def _created_at(kid: str) -> datetime:
+    return datetime.strptime(kid.split("-", 1)[0], _KID_TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+class KeyRing:
+    """
+    Llaves cargadas desde el directorio. Se recarga cuando cambia el mtime
+    del directorio (una llave nueva o podada por otro proceso)
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._keys: Dict[str, SigningKey] = {}
+        self._jwks: Dict[str, Any] = {"keys": []}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        keys = {}
+        for filename in sorted(os.listdir(self.directory)):
+            kid, ext = os.path.splitext(filename)
+            if ext != ".pem":
+                continue
+            try:
+                with open(os.path.join(self.directory, filename), "rb") as f:
+                    pem = f.read()
+                private_key = ECKey(pem, KEY_ALGORITHM)
+                keys[kid] = SigningKey(kid, _created_at(kid), private_key, private_key.public_key())
+            except Exception:
+                logger.exception(f"Llave JWT inválida: {filename}")
+        self._keys = keys
+        self._jwks = {"keys": [key.public_jwk() for key in self.keys()]}
+
+    def refresh(self, force: bool = False, throttle: bool = True) -> None:
+        if not force and throttle and time.monotonic() - self._checked_at < _REFRESH_INTERVAL_SECONDS:
+            return
+        self._checked_at = time.monotonic()
+        try:
+            mtime = os.stat(self.directory).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if not force and mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime is not None:
+                self._load()
+            else:
+                self._keys, self._jwks = {}, {"keys": []}
+            self._mtime = mtime
+
+    def keys(self) -> List[SigningKey]:
+        return sorted(self._keys.values(), key=lambda key: key.created_at)
+
+    def signing_key(self) -> SigningKey:
+        """
+        La llave más nueva ya activada; si ninguna lo está (primer arranque),
+        la más antigua
+        """
+        self.refresh()
+        keys = self.keys()
+        if not keys:
+            raise RuntimeError(
+                f"No hay llaves JWT en {self.directory}; ejecutar: python -m app.core.keys generate"
+            )
+        now = datetime.now(timezone.utc)
+        active = [key for key in keys if key.activates_at <= now]
+        return active[-1] if active else keys[0]
+
+    def verification_key(self, kid: str) -> Optional[SigningKey]:
+        key = self._keys.get(kid)
+        if key is None:
+            # Puede ser una llave creada por otra instancia después de la última carga;
+            # solo se recarga si el directorio cambió
+            self.refresh(throttle=False)
+            key = self._keys.get(kid)
+        return key
+
+    def jwks(self) -> Dict[str, Any]:
+        self.refresh()
+        return self._jwks
+
+    def generate(self) -> SigningKey:
+        os.makedirs(self.directory, exist_ok=True)
+        kid = f"{datetime.now(timezone.utc).strftime(_KID_TIME_FORMAT)}-{secrets.token_hex(4)}"
+        pem = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        path = os.path.join(self.directory, f"{kid}.pem")
+        # Escritura atómica y solo legible por el dueño
+        tmp_path = f"{path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(tmp_path, path)
+        self.refresh(force=True)
+        logger.info(f"Llave JWT generada: {kid}")
+        return self._keys[kid]
+
+    def rotate(self) -> Optional[SigningKey]:
+        """
+        Genera una llave si la más nueva cumplió JWT_KEY_ROTATION_DAYS y poda
+        las retiradas. Si otra instancia rota al mismo tiempo quedan dos llaves
+        nuevas, lo que no afecta la verificación
+        """
+        self.refresh()
+        keys = self.keys()
+        new_key = None
+        rotation_age = timedelta(days=settings.JWT_KEY_ROTATION_DAYS)
+        if not keys or datetime.now(timezone.utc) - keys[-1].created_at >= rotation_age:
+            new_key = self.generate()
+        self.prune()
+        return new_key
+
+    def prune(self) -> List[str]:
+        """
+        Elimina las llaves cuyo sucesor lleva firmando más que la vida de un
+        refresh token: ya no puede quedar ningún token vigente firmado con ellas
+        """
+        self.refresh()
+        keys = self.keys()
+        max_token_age = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        now = datetime.now(timezone.utc)
+        pruned = []
+        for key, successor in zip(keys, keys[1:]):
+            if successor.activates_at + max_token_age < now:
+                os.remove(os.path.join(self.directory, f"{key.kid}.pem"))
+                pruned.append(key.kid)
+        if pruned:
+            self.refresh(force=True)
+            logger.info(f"Llaves JWT retiradas: {', '.join(pruned)}")
+        return pruned
+
+
+keyring = KeyRing(settings.JWT_KEYS_DIR)
+
+
+def uses_asymmetric_keys() -> bool:
+    return settings.ALGORITHM == KEY_ALGORITHM
+
+
+async def run_key_rotation() -> None:
+    """
+    Tarea de fondo: revisa cada hora si corresponde rotar la llave de firma
+    """
+    while True:
+        await asyncio.sleep(3600)
+        try:
+            await asyncio.to_thread(keyring.rotate)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error rotando llaves JWT")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if command == "generate":
+        keyring.generate()
+    elif command == "rotate":
+        keyring.rotate()
+    elif command != "list":
+        sys.exit(f"Comando desconocido: {command} (generate, rotate, list)")
+    keyring.refresh(force=True)
+    signing_kid = keyring.signing_key().kid if keyring.keys() else None
+    for key in keyring.keys():
+        marker = "*" if key.kid == signing_kid else " "
+        print(f"{marker} {key.kid}  activa desde {key.activates_at.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
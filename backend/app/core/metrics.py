@@ -0,0 +1,206 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Buckets en segundos, al estilo Prometheus
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Histograma de buckets fijos. Sin locks: bajo el GIL cada incremento es
+    atómico en la práctica y una pérdida ocasional es aceptable para métricas.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class LabeledHistogram:
+    """
+    Un Histogram por combinación de valores de labels
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], Histogram] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        histogram = self.series.get(label_values)
+        if histogram is None:
+            histogram = self.series.setdefault(label_values, Histogram(self.buckets))
+        histogram.observe(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, histogram in list(self.series.items()):
+            base = _format_labels(self.labels, label_values)
+            for bound, cumulative in histogram.snapshot()["buckets"].items():
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_merge_labels(base, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_wrap(base)} {histogram.sum}")
+            lines.append(f"{self.name}_count{_wrap(base)} {histogram.count}")
+        return lines
+
+
+class LabeledCounter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.series: Dict[Tuple[str, ...], int] = {}
+
+    def inc(self, *label_values: str, amount: int = 1) -> None:
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in list(self.series.items()):
+            lines.append(f"{self.name}{_wrap(_format_labels(self.labels, label_values))} {value}")
+        return lines
+
+
+class Gauge:
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _wrap(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def _merge_labels(base: str, extra: str) -> str:
+    return f"{{{base},{extra}}}" if base else f"{{{extra}}}"
+
+
+def render_gauge(name: str, help: str, samples: Dict[Tuple[Tuple[str, str], ...], float]) -> List[str]:
+    """
+    Gauge calculado al momento del scrape; samples: {((label, valor), ...): valor}
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for labels, value in samples.items():
+        names = [k for k, _ in labels]
+        values = [v for _, v in labels]
+        lines.append(f"{name}{_wrap(_format_labels(names, values))} {value}")
+    return lines
+
+
+def render_counter(name: str, help: str, samples: Dict[Tuple[Tuple[str, str], ...], float]) -> List[str]:
+    """
+    Contador acumulado leído al momento del scrape (se expone con sufijo
+    _total); samples como en render_gauge
+    """
+    name = f"{name}_total"
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+    for labels, value in samples.items():
+        names = [k for k, _ in labels]
+        values = [v for _, v in labels]
+        lines.append(f"{name}{_wrap(_format_labels(names, values))} {value}")
+    return lines
+
+
+# Métricas de la aplicación
+http_requests_total = LabeledCounter(
+    "http_requests_total", "Requests HTTP procesados", ("method", "route", "status")
+)
+http_request_duration = LabeledHistogram(
+    "http_request_duration_seconds", "Latencia de requests HTTP", ("method", "route")
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "Requests HTTP en curso")
+db_queries_per_request = LabeledHistogram(
+    "db_queries_per_request", "Sentencias SQL ejecutadas por request", ("route",), COUNT_BUCKETS
+)
+db_time_per_request = LabeledHistogram(
+    "db_time_per_request_seconds", "Tiempo total en la base de datos por request", ("route",)
+)
+db_query_duration = LabeledHistogram("db_query_duration_seconds", "Duración de cada sentencia SQL")
+password_hash_duration = LabeledHistogram("password_hash_duration_seconds", "Tiempo de cálculo de bcrypt")
+password_hash_queue_wait = LabeledHistogram(
+    "password_hash_queue_wait_seconds", "Espera en la cola del pool de hashing"
+)
+token_verify_duration = LabeledHistogram(
+    "token_verify_duration_seconds", "Tiempo de verificación de tokens JWT", buckets=(
+        0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01
+    )
+)
+attendance_batch_size = LabeledHistogram(
+    "attendance_batch_size", "Marcaciones por commit", buckets=COUNT_BUCKETS + (200, 500, 1000)
+)
+attendance_commit_duration = LabeledHistogram(
+    "attendance_commit_duration_seconds", "Duración de cada lote de marcaciones (validación, insert y commit)"
+)
+attendance_ack_latency = LabeledHistogram(
+    "attendance_ack_latency_seconds", "Tiempo desde que se encola una marcación hasta su confirmación"
+)
+
+METRICS = [
+    http_requests_total,
+    http_request_duration,
+    http_requests_in_flight,
+    db_queries_per_request,
+    db_time_per_request,
+    db_query_duration,
+    password_hash_duration,
+    password_hash_queue_wait,
+    token_verify_duration,
+    attendance_batch_size,
+    attendance_commit_duration,
+    attendance_ack_latency,
+]
+
+# Colectores adicionales (pools, caches) que se evalúan en cada scrape
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    _collectors.append(collector)
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# Acumulador de [sentencias, segundos] de base de datos del request en curso
+request_db_stats: ContextVar[Optional[List[float]]] = ContextVar("request_db_stats", default=None)
\ No newline at end of file
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica la clave de ordenamiento de la última fila como cursor opaco
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Tuple[type, ...]) -> List[Any]:
+    """
+    Decodifica un cursor generado por encode_cursor y valida que tenga un
+    valor por cada tipo de types (datetime se parsea desde ISO 8601). Un
+    cursor mal formado o manipulado responde 400
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor must be a list of the expected length")
+        for position, expected in enumerate(types):
+            if expected is datetime:
+                values[position] = datetime.fromisoformat(values[position])
+            # bool es subclase de int en Python: no es un id válido
+            elif not isinstance(values[position], expected) or isinstance(values[position], bool):
+                raise ValueError(f"cursor value {position} must be {expected.__name__}")
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido",
+        )
\ No newline at end of file
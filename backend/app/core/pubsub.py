@@ -0,0 +1,183 @@
+"""
+Pub/sub asyncio para los canales en tiempo real.
+
+Cada cliente tiene una Subscription con sus mensajes pendientes indexados
+por clave: un mensaje nuevo con la misma clave reemplaza al pendiente
+(coalescing), y si el cliente acumula más de max_pending se descartan y se
+le envía un único "resync" para que recargue el estado por REST. publish
+nunca espera a los clientes lentos.
+"""
+import asyncio
+import json
+import logging
+from collections import OrderedDict, defaultdict
+from itertools import count
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (clave de coalescing o None, payload)
+Message = Tuple[Optional[str], Dict[str, Any]]
+
+RESYNC_KEY = "__resync__"
+
+
+class Subscription:
+    def __init__(self, channels: Iterable[str], max_pending: int):
+        self.channels = tuple(channels)
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._sequence = count()
+        self.coalesced = 0
+        self.resyncs = 0
+
+    def offer(self, key: Optional[str], payload: Dict[str, Any]) -> None:
+        if key is None:
+            key = f"__{next(self._sequence)}"
+        if key in self._pending:
+            self._pending[key] = payload
+            self.coalesced += 1
+        else:
+            if len(self._pending) >= self.max_pending:
+                # Cliente lento: lo pendiente ya no sirve, que recargue el estado
+                self._pending.clear()
+                self._pending[RESYNC_KEY] = {"type": "resync"}
+                self.resyncs += 1
+            self._pending[key] = payload
+        self._ready.set()
+
+    async def next_batch(self, max_batch: int) -> List[Dict[str, Any]]:
+        await self._ready.wait()
+        batch = []
+        while self._pending and len(batch) < max_batch:
+            batch.append(self._pending.popitem(last=False)[1])
+        if not self._pending:
+            self._ready.clear()
+        return batch
+
+
+class Broker:
+    """
+    Entrega local a las suscripciones del proceso; los backends compartidos
+    solo cambian cómo llega el mensaje a cada worker
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._closed_stats = {"coalesced": 0, "resyncs": 0}
+        self.slow_disconnects = 0
+
+    def subscribe(self, channels: Iterable[str], max_pending: Optional[int] = None) -> Subscription:
+        subscription = Subscription(channels, max_pending or settings.REALTIME_MAX_PENDING)
+        for channel in subscription.channels:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self._subscriptions.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[channel]
+        self._closed_stats["coalesced"] += subscription.coalesced
+        self._closed_stats["resyncs"] += subscription.resyncs
+
+    def _deliver(self, channel: str, messages: List[Message]) -> None:
+        for subscription in self._subscriptions.get(channel, ()):
+            for key, payload in messages:
+                subscription.offer(key, payload)
+
+    async def publish(self, channel: str, messages: List[Message]) -> None:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        active = {subscription for subscribers in self._subscriptions.values() for subscription in subscribers}
+        return {
+            "subscriptions": len(active),
+            "channels": len(self._subscriptions),
+            "coalesced": self._closed_stats["coalesced"] + sum(s.coalesced for s in active),
+            "resyncs": self._closed_stats["resyncs"] + sum(s.resyncs for s in active),
+            "slow_disconnects": self.slow_disconnects,
+        }
+
+
+class LocalBroker(Broker):
+    """
+    Solo dentro del proceso: suficiente con un worker
+    """
+
+    async def publish(self, channel: str, messages: List[Message]) -> None:
+        self._deliver(channel, messages)
+
+
+class RedisBroker(Broker):
+    """
+    Reparte los mensajes entre workers con Redis pub/sub (requiere el paquete
+    redis). Cada worker escucha todos los canales del prefijo y entrega solo a
+    sus suscripciones locales
+    """
+
+    def __init__(self, url: str, prefix: str = "realtime"):
+        super().__init__()
+        import redis.asyncio as redis
+
+        # publish corre dentro del request: con Redis caído no espera más que REDIS_TIMEOUT_SECONDS
+        self._publisher = redis.Redis.from_url(
+            url,
+            socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+        )
+        # Sin socket_timeout: la suscripción pasa la mayor parte del tiempo esperando
+        self._subscriber = redis.Redis.from_url(url, socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS)
+        self._prefix = f"{prefix}:"
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, messages: List[Message]) -> None:
+        await self._publisher.publish(self._prefix + channel, json.dumps(messages, default=str))
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+        await self._publisher.aclose()
+        await self._subscriber.aclose()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._subscriber.pubsub()
+                await pubsub.psubscribe(self._prefix + "*")
+                async for event in pubsub.listen():
+                    if event["type"] != "pmessage":
+                        continue
+                    channel = event["channel"].decode()[len(self._prefix):]
+                    self._deliver(channel, [tuple(message) for message in json.loads(event["data"])])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error escuchando Redis pub/sub, reintentando")
+                await asyncio.sleep(1)
+
+
+def create_broker() -> Broker:
+    """
+    Crea el backend configurado en REALTIME_BACKEND ("local" o "redis")
+    """
+    if settings.REALTIME_BACKEND == "redis":
+        return RedisBroker(settings.REDIS_URL)
+    return LocalBroker()
+
+
+broker = create_broker()
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Límite de intentos (token bucket) para los endpoints de autenticación.
+
+Cada clave (p.ej. "login:ip:1.2.3.4") tiene un bucket de `capacity` fichas
+que se recargan a capacity/period por segundo; cada intento consume una.
+Se revisa antes de cualquier query o hash, así que un intento rechazado
+cuesta un lookup en memoria.
+
+El backend local reparte las claves en shards con lock propio y compacta
+cada shard periódicamente (descarta los buckets que ya se recargaron por
+completo, equivalentes a no tener entrada); sobre el máximo de claves
+descarta las usadas hace más tiempo. Con varios workers, el límite
+local se aplica por proceso; RATE_LIMIT_BACKEND=redis lo comparte.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_COMPACT_INTERVAL_SECONDS = 60
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    async def hit(self, key: str, capacity: int, period: float) -> float:
+        """
+        Consume una ficha de key; devuelve 0 si se permite o los segundos que
+        faltan para la próxima ficha si se rechaza
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "next_compaction")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # clave -> (fichas, última actualización, instante en que vuelve a estar lleno)
+        self.buckets: Dict[str, Tuple[float, float, float]] = {}
+        self.next_compaction = time.monotonic() + _COMPACT_INTERVAL_SECONDS
+
+
+class LocalRateLimiter(RateLimiter):
+    """
+    En memoria del proceso, con shards para no serializar todos los
+    requests en un lock
+    """
+
+    def __init__(self, shards: int, max_keys: int):
+        self._shards = [_Shard() for _ in range(shards)]
+        self._max_keys_per_shard = max(1, max_keys // shards)
+        self.rejected = 0
+
+    async def hit(self, key: str, capacity: int, period: float) -> float:
+        rate = capacity / period
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with shard.lock:
+            # pop + reinserción: el orden del dict queda de menos a más recientemente usado
+            bucket = shard.buckets.pop(key, None)
+            tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            retry_after = 0.0
+            if tokens < 1:
+                retry_after = (1 - tokens) / rate
+                self.rejected += 1
+            else:
+                tokens -= 1
+            shard.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            if now >= shard.next_compaction or len(shard.buckets) > self._max_keys_per_shard:
+                self._compact(shard, now)
+        return retry_after
+
+    def _compact(self, shard: _Shard, now: float) -> None:
+        # Primero los buckets ya llenos (equivalen a no tener entrada)
+        shard.buckets = {key: bucket for key, bucket in shard.buckets.items() if bucket[2] > now}
+        # Inundación de claves distintas: se olvidan las usadas hace más tiempo,
+        # con margen para no compactar de nuevo en cada intento. Una clave que
+        # sigue recibiendo intentos (p.ej. una cuenta bloqueada) no se pierde
+        if len(shard.buckets) > self._max_keys_per_shard:
+            excess = len(shard.buckets) - int(self._max_keys_per_shard * 0.9)
+            for key in list(shard.buckets)[:excess]:
+                del shard.buckets[key]
+        shard.next_compaction = now + _COMPACT_INTERVAL_SECONDS
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": sum(len(shard.buckets) for shard in self._shards), "rejected": self.rejected}
+
+
+# Token bucket atómico en Redis: mismo cálculo que LocalRateLimiter.hit
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens < 1 then
+    retry_after = (1 - tokens) / rate
+else
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'u', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Compartido entre workers (requiere el paquete redis, ver
+    requirements-redis.txt). Si Redis no responde dentro de
+    REDIS_TIMEOUT_SECONDS, se permite el intento: el límite no debe bloquear
+    el login
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit"):
+        import redis.asyncio as redis
+
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+        )
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+        self._prefix = f"{prefix}:"
+        self.rejected = 0
+        self.errors = 0
+
+    async def hit(self, key: str, capacity: int, period: float) -> float:
+        try:
+            retry_after = float(await self._script(keys=[self._prefix + key], args=[capacity, capacity / period, time.time()]))
+        except Exception:
+            self.errors += 1
+            logger.exception("Error consultando el límite de intentos en Redis")
+            return 0.0
+        if retry_after:
+            self.rejected += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rejected": self.rejected, "errors": self.errors}
+
+
+def create_rate_limiter() -> RateLimiter:
+    """
+    Crea el backend configurado en RATE_LIMIT_BACKEND ("local" o "redis")
+    """
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(settings.REDIS_URL)
+    return LocalRateLimiter(settings.RATE_LIMIT_SHARDS, settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = create_rate_limiter()
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # La última dirección la agrega el proxy de confianza; las anteriores las envía el cliente
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_rate_limit(
+    request: Request, scope: str, per_ip: int, account: Optional[str] = None, per_account: int = 0
+) -> None:
+    """
+    Consume una ficha de la IP del cliente y, si se indica, de la cuenta
+    (email normalizado). Lanza RateLimitExceeded con el primero que se agote
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    keys = [(f"{scope}:ip:{client_ip(request)}", per_ip)]
+    if account:
+        keys.append((f"{scope}:account:{account.strip().lower()}", per_account))
+    for key, capacity in keys:
+        retry_after = await rate_limiter.hit(key, capacity, settings.RATE_LIMIT_PERIOD_SECONDS)
+        if retry_after:
+            raise RateLimitExceeded(retry_after)
\ No newline at end of file
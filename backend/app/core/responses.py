@@ -0,0 +1,12 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serializado con orjson. OPT_UTC_Z produce el mismo formato
+    de fechas que Pydantic, así que el body es idéntico al de response_model.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
\ No newline at end of file
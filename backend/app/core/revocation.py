@@ -0,0 +1,48 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class RevocationList:
+    """
+    Índice en memoria de jti revocados. El lookup es un acceso a dict (sin
+    consulta a la base de datos por request) y las entradas se podan solas
+    cuando el token revocado ya habría expirado.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._expirations: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def add(self, jti: str, expires_at: float) -> None:
+        if expires_at <= time.time():
+            return
+        with self._lock:
+            if jti not in self._revoked:
+                self._revoked[jti] = expires_at
+                heapq.heappush(self._expirations, (expires_at, jti))
+            self._prune_locked()
+
+    def prune(self) -> int:
+        with self._lock:
+            return self._prune_locked()
+
+    def _prune_locked(self) -> int:
+        now = time.time()
+        removed = 0
+        while self._expirations and self._expirations[0][0] <= now:
+            _, jti = heapq.heappop(self._expirations)
+            self._revoked.pop(jti, None)
+            removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocation_list = RevocationList()
\ No newline at end of file
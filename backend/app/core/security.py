@@ -1,9 +1,103 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+from app.core.metrics import password_hash_duration, password_hash_queue_wait
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+class HashingOverloadedError(Exception):
+    """
+    Se lanza cuando la cola de hashing está llena y la solicitud se rechaza
+    """
+
+
+class PasswordHasher:
+    """
+    Ejecuta bcrypt en un pool de threads dedicado con una cola acotada,
+    para que una ráfaga de logins no sature el threadpool de Starlette
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="password-hash"
+        )
+        self._capacity = max_workers + max_queue
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "queue_wait_seconds_total": 0.0,
+            "queue_wait_seconds_max": 0.0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0,
+        }
+
+    def _record(self, queue_wait: float, hash_time: float) -> None:
+        password_hash_queue_wait.observe(queue_wait)
+        password_hash_duration.observe(hash_time)
+        with self._lock:
+            self._stats["completed"] += 1
+            self._stats["queue_wait_seconds_total"] += queue_wait
+            self._stats["queue_wait_seconds_max"] = max(self._stats["queue_wait_seconds_max"], queue_wait)
+            self._stats["hash_seconds_total"] += hash_time
+            self._stats["hash_seconds_max"] = max(self._stats["hash_seconds_max"], hash_time)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Encola fn en el pool; rechaza de inmediato si la cola está llena
+        """
+        with self._lock:
+            if self._pending >= self._capacity:
+                self._stats["rejected"] += 1
+                raise HashingOverloadedError()
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        # El cupo se libera cuando termina (o se cancela antes de empezar) el
+        # trabajo en el pool, no cuando se cancela el request que lo espera
+        future = self._executor.submit(task)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "pending": self._pending, "capacity": self._capacity}
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
\ No newline at end of file
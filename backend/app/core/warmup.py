@@ -0,0 +1,35 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.core.auth import TokenManager
+from app.core.security import pwd_context
+from app.schemas.tenant import Tenant, TenantCreate
+from app.schemas.user import User
+
+
+def warm_up_crypto() -> None:
+    """
+    Carga el backend de bcrypt y el de JWT (ambos se inicializan de forma
+    perezosa en el primer uso), sin calcular un hash completo
+    """
+    pwd_context.handler("bcrypt").get_backend()
+    dummy = SimpleNamespace(id=0, email="warmup@localhost", is_superadmin=False, is_active=True)
+    token = TokenManager.create_token(dummy, "access")["token"]
+    TokenManager.verify_token(token, "access")
+
+
+def warm_up_schemas() -> None:
+    """
+    Ejercita la validación y serialización de los schemas más usados
+    """
+    now = datetime.utcnow()
+    TenantCreate(name="warmup", rut="11.111.111-1")
+    Tenant.model_validate(
+        SimpleNamespace(id=0, name="warmup", rut="111111111", is_active=True, created_at=now, updated_at=None)
+    ).model_dump_json()
+    User.model_validate(
+        SimpleNamespace(
+            id=0, email="warmup@example.com", nombre=None, apellido=None, is_active=True,
+            is_superadmin=False, tenant_id=None, created_at=now, updated_at=None
+        )
+    ).model_dump_json()
\ No newline at end of file
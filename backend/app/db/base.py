@@ -1,3 +1,13 @@
 from app.db.session import Base
 from app.models.tenant import Tenant
-from app.models.user import User 
\ No newline at end of file
+from app.models.user import User
+from app.models.revoked_token import RevokedToken
+from app.models.refresh_session import RefreshSession
+from app.models.installation import Installation
+from app.models.guard import Guard
+from app.models.shift import Shift
+from app.models.coverage import InstallationCoverage, TenantCoverage
+from app.models.attendance import AttendanceMark
+from app.models.round_event import RoundEvent
+from app.models.audit_log import AuditLog
+from app.models.collection_version import CollectionVersion
\ No newline at end of file
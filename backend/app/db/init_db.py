@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.db.session import SessionLocal, async_engine, engine
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def database_at_head() -> bool:
+    """
+    True si la revisión de Alembic aplicada en la base coincide con el head
+    de los scripts de migración (y por lo tanto create_all no haría nada)
+    """
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    head = ScriptDirectory.from_config(config).get_current_head()
+    try:
+        with engine.connect() as connection:
+            current = MigrationContext.configure(connection).get_current_revision()
+    except Exception:
+        logger.exception("No se pudo leer la revisión de Alembic")
+        return False
+    return current is not None and current == head
+
+
+def create_tables() -> None:
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_superadmin(db: Session) -> bool:
+    """
+    Crea el superadmin configurado si no existe; devuelve True si lo creó
+    """
+    superadmin = db.query(User).filter(func.lower(User.email) == settings.FIRST_SUPERADMIN_EMAIL.lower()).first()
+    if superadmin:
+        return False
+    superadmin = User(
+        email=settings.FIRST_SUPERADMIN_EMAIL,
+        hashed_password=get_password_hash(settings.FIRST_SUPERADMIN_PASSWORD),
+        is_superadmin=True,
+        is_active=True
+    )
+    db.add(superadmin)
+    db.commit()
+    return True
+
+
+async def prefill_pool(connections: int) -> None:
+    """
+    Abre `connections` conexiones en paralelo para que el pool quede lleno
+    antes de recibir tráfico
+    """
+    async def ping():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
+
+
+def main() -> None:
+    """
+    Comando de una sola vez: python -m app.db.init_db
+    Crea las tablas faltantes y el superadmin inicial
+    """
+    logging.basicConfig(level=logging.INFO)
+    create_tables()
+    db = SessionLocal()
+    try:
+        if seed_superadmin(db):
+            logger.info("Superadmin creado exitosamente")
+        else:
+            logger.info("El superadmin ya existe")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EXPLAIN_PREFIX = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+
+class RequestProfile:
+    __slots__ = ("statements", "query_count", "total_time")
+
+    def __init__(self):
+        self.statements: Counter = Counter()
+        self.query_count = 0
+        self.total_time = 0.0
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> Optional[str]:
+    """
+    Ejecuta EXPLAIN (sin ANALYZE) sobre un cursor DBAPI propio, para no
+    disparar de nuevo los eventos del engine
+    """
+    prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f"EXPLAIN falló: {e}"
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiler_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["profiler_start_time"].pop()
+
+    profile = current_profile.get()
+    if profile is not None:
+        profile.statements[statement] += 1
+        profile.query_count += 1
+        profile.total_time += elapsed
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        plan = _explain(conn, statement, parameters) if settings.SQL_PROFILER_EXPLAIN else None
+        logger.warning(
+            f"Query lenta ({elapsed * 1000:.1f}ms): {statement} | params={str(parameters)[:500]}"
+            + (f"\n{plan}" if plan else "")
+        )
+
+
+def enable_profiler() -> None:
+    """
+    Registra los listeners del profiler en todos los engines (opt-in)
+    """
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report_profile(profile: RequestProfile, method: str, path: str) -> None:
+    """
+    Reporta sentencias idénticas repetidas en un mismo request (patrón N+1)
+    """
+    for statement, count in profile.statements.items():
+        if count >= settings.SQL_N_PLUS_ONE_THRESHOLD:
+            logger.warning(f"Posible N+1 en {method} {path}: {count} ejecuciones de: {statement}")
+
+
+class SQLProfilerMiddleware:
+    """
+    Middleware ASGI que abre un perfil de SQL por request y, fuera de
+    producción, agrega X-DB-Query-Count y X-DB-Query-Time a la respuesta
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.emit_headers = "production" not in settings.ENVIRONMENT.lower()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and self.emit_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(profile.query_count).encode()))
+                headers.append((b"x-db-query-time", f"{profile.total_time * 1000:.2f}ms".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            route = scope.get("route")
+            report_profile(profile, scope["method"], getattr(route, "path", scope["path"]))
\ No newline at end of file
@@ -1,12 +1,115 @@
-from sqlalchemy import create_engine
+import time
+from typing import Any, Dict
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import Histogram, db_query_duration, request_db_stats
+
+
+class PoolStatsMixin:
+    """
+    Registra el tiempo de espera por una conexión del pool y los timeouts
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram()
+        self.timeouts = 0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_time.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # Conserva las métricas si el pool se recrea (p.ej. tras engine.dispose())
+        pool = super().recreate()
+        pool.wait_time = self.wait_time
+        pool.timeouts = self.timeouts
+        return pool
+
+
+class InstrumentedQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Opciones de pool según Settings. En SQLite se usan los defaults del dialecto.
+    """
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
 
-engine = create_engine(settings.DATABASE_URL)
+    if settings.DB_USE_NULL_POOL:
+        # PgBouncer en modo transacción: el pooling lo hace PgBouncer y
+        # asyncpg no puede reutilizar prepared statements entre conexiones
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    db_query_duration.observe(elapsed)
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine asíncrono para el manejo de requests (asyncpg en Postgres, aiosqlite en tests)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    **engine_options(settings.DATABASE_URL, is_async=True)
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 def get_db():
@@ -14,4 +117,28 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Estado actual de los pools (sync y async) para monitoreo
+    """
+    stats = {}
+    for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        entry: Dict[str, Any] = {"class": type(pool).__name__, "status": pool.status()}
+        if isinstance(pool, QueuePool):
+            entry.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        if isinstance(pool, PoolStatsMixin):
+            entry["timeouts"] = pool.timeouts
+            entry["wait_seconds"] = pool.wait_time.snapshot()
+        stats[name] = entry
+    return stats
\ No newline at end of file
@@ -1,14 +1,32 @@
+import asyncio
 import logging
-from fastapi import FastAPI
+import math
+import time
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
-from app.db.session import engine, Base
-from app.models.user import User
-from app.routers import auth, tenants
-from app.core.security import get_password_hash
+from app.core.http_cache import etag_matches, make_etag
+from app.core.keys import keyring, run_key_rotation, uses_asymmetric_keys
+from app.core.pubsub import broker
+from app.core.rate_limit import RateLimitExceeded
+from app.core.responses import FastJSONResponse
+from app.db.session import SessionLocal, AsyncSessionLocal, pool_stats
+from app.db.init_db import create_tables, database_at_head, prefill_pool, seed_superadmin
+from app.routers import attendance, audit, auth, guards, installations, realtime, rounds, tenants
+from app.services.attendance import AttendanceOverloadedError, mark_writer
+from app.services.audit import audit_writer
+from app.services.principal_cache import principal_cache
+from app.services.revocation import sync_revocations, run_revocation_sync
+from app.services.rounds import ensure_upcoming, run_round_maintenance
+from app.core.security import HashingOverloadedError
+from app.core.warmup import warm_up_crypto, warm_up_schemas
+from app.core.metrics import register_collector, render_prometheus
+from app.middleware.metrics import MetricsMiddleware, runtime_metrics
+from app.db.profiler import SQLProfilerMiddleware, enable_profiler
 
 # Configuración de logging
 logging.basicConfig(
@@ -30,11 +48,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count", "X-DB-Query-Count", "X-DB-Query-Time"],
 )
 
+# Profiler de SQL (N+1, queries lentas); solo si se habilita explícitamente
+if settings.SQL_PROFILER_ENABLED:
+    enable_profiler()
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Métricas (se agrega al final para que envuelva también a CORS)
+app.add_middleware(MetricsMiddleware)
+register_collector(runtime_metrics)
+
 # Routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(tenants.router, prefix=f"{settings.API_V1_STR}/tenants", tags=["tenants"])
+app.include_router(installations.router, prefix=f"{settings.API_V1_STR}/installations", tags=["installations"])
+app.include_router(guards.router, prefix=f"{settings.API_V1_STR}/guards", tags=["guards"])
+app.include_router(attendance.router, prefix=f"{settings.API_V1_STR}/attendance", tags=["attendance"])
+app.include_router(rounds.router, prefix=f"{settings.API_V1_STR}/rounds", tags=["rounds"])
+app.include_router(audit.router, prefix=f"{settings.API_V1_STR}/audit", tags=["audit"])
+app.include_router(realtime.router, prefix=f"{settings.API_V1_STR}/ws", tags=["realtime"])
 
 # Endpoints de salud y debug
 @app.get("/health")
@@ -45,6 +79,34 @@ async def health_check():
         "debug": settings.DEBUG
     }
 
+@app.get("/health/db-pool")
+async def db_pool_stats():
+    return pool_stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+async def readiness_check():
+    # Solo reporta listo cuando terminó el arranque (pool lleno y warm-up hecho)
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks(request: Request):
+    """
+    Llaves públicas para que otros servicios verifiquen los tokens sin
+    llamar a esta API. Con HS256 no hay llaves públicas que publicar
+    """
+    keys = keyring.jwks() if uses_asymmetric_keys() else {"keys": []}
+    etag = make_etag(*(key["kid"] for key in keys["keys"]))
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.JWKS_CACHE_SECONDS}"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(keys, headers=headers)
+
 @app.get("/cors-debug")
 async def cors_debug():
     return {
@@ -58,36 +120,118 @@ async def cors_debug():
 async def validation_exception_handler(request, exc):
     return JSONResponse(
         status_code=422,
-        content={"detail": exc.errors()},
+        # Los errores de validators propios traen la excepción en ctx: no es serializable tal cual
+        content={"detail": jsonable_encoder(exc.errors())},
+    )
+
+@app.exception_handler(HashingOverloadedError)
+async def hashing_overloaded_handler(request, exc):
+    # Cola de bcrypt llena: rechazo rápido en vez de encolar indefinidamente
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servicio de autenticación saturado, intente nuevamente"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(AttendanceOverloadedError)
+async def attendance_overloaded_handler(request, exc):
+    # Cola de marcaciones llena: el dispositivo conserva las marcaciones y reintenta
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Registro de marcaciones saturado, intente nuevamente"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_handler(request, exc):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Demasiados intentos, intente más tarde"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
     )
 
 # Eventos de inicio
 @app.on_event("startup")
 async def startup_event():
-    # Crear tablas
-    Base.metadata.create_all(bind=engine)
-    
-    # Crear superadmin si no existe
-    from app.db.session import SessionLocal
-    db = SessionLocal()
-    try:
-        superadmin = db.query(User).filter(User.email == settings.FIRST_SUPERADMIN_EMAIL).first()
-        if not superadmin:
-            superadmin = User(
-                email=settings.FIRST_SUPERADMIN_EMAIL,
-                hashed_password=get_password_hash(settings.FIRST_SUPERADMIN_PASSWORD),
-                is_superadmin=True,
-                is_active=True
-            )
-            db.add(superadmin)
-            db.commit()
-            logger.info("Superadmin creado exitosamente")
-    finally:
-        db.close()
+    app.state.ready = False
+    timings = {}
+    started = time.perf_counter()
+
+    def mark(phase: str, since: float) -> float:
+        now = time.perf_counter()
+        timings[phase] = (now - since) * 1000
+        return now
+
+    phase_start = started
+    if settings.FAST_STARTUP and database_at_head():
+        # El esquema ya está migrado: create_all solo reflejaría tablas existentes
+        logger.info("Esquema en el head de Alembic, se omite create_all")
+    else:
+        create_tables()
+    phase_start = mark("schema", phase_start)
+
+    # En modo rápido el superadmin se crea con: python -m app.db.init_db
+    if not settings.FAST_STARTUP:
+        db = SessionLocal()
+        try:
+            if seed_superadmin(db):
+                logger.info("Superadmin creado exitosamente")
+        finally:
+            db.close()
+        phase_start = mark("seed_superadmin", phase_start)
+
+    # Cargar tokens revocados vigentes y mantener el índice sincronizado entre workers
+    async with AsyncSessionLocal() as async_db:
+        revoked = await sync_revocations(async_db)
+    logger.info(f"Tokens revocados cargados: {revoked}")
+    app.state.revocation_sync_task = asyncio.create_task(run_revocation_sync())
+    phase_start = mark("revocations", phase_start)
+
+    # Llaves de firma: crea la primera o rota si corresponde, y revisa cada hora
+    if uses_asymmetric_keys():
+        await asyncio.to_thread(keyring.rotate)
+        app.state.key_rotation_task = asyncio.create_task(run_key_rotation())
+        logger.info(f"Llave de firma JWT: {keyring.signing_key().kid}")
+        phase_start = mark("signing_keys", phase_start)
+
+    # Particiones de eventos de ronda (PostgreSQL): la actual y las próximas, revisadas cada hora
+    async with AsyncSessionLocal() as async_db:
+        await ensure_upcoming(async_db)
+    app.state.round_maintenance_task = asyncio.create_task(run_round_maintenance())
+    phase_start = mark("round_partitions", phase_start)
+
+    await broker.start()
+    await principal_cache.start()
+    await mark_writer.start()
+    await audit_writer.start()
+
+    if settings.STARTUP_PREFILL_CONNECTIONS > 0:
+        await prefill_pool(settings.STARTUP_PREFILL_CONNECTIONS)
+        phase_start = mark("pool_prefill", phase_start)
+
+    warm_up_crypto()
+    warm_up_schemas()
+    mark("warmup", phase_start)
+
+    app.state.ready = True
+    breakdown = ", ".join(f"{phase}={ms:.1f}ms" for phase, ms in timings.items())
+    logger.info(f"Inicio completado en {(time.perf_counter() - started) * 1000:.1f}ms ({breakdown})")
     
     # Log de configuración
     logger.info(f"Entorno: {settings.ENVIRONMENT}")
     logger.info(f"Debug: {settings.DEBUG}")
     logger.info(f"Orígenes CORS configurados: {origins}")
     if '*' in origins:
-        logger.warning("ADVERTENCIA: CORS está configurado para permitir todos los orígenes (*). Esto no es recomendado en producción.") 
\ No newline at end of file
+        logger.warning("ADVERTENCIA: CORS está configurado para permitir todos los orígenes (*). Esto no es recomendado en producción.") 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.revocation_sync_task.cancel()
+    app.state.round_maintenance_task.cancel()
+    # Las marcaciones encoladas ya tienen un request esperando: se escriben antes de salir
+    await mark_writer.stop()
+    await audit_writer.stop()
+    await principal_cache.stop()
+    await broker.stop()
+    if getattr(app.state, "key_rotation_task", None):
+        app.state.key_rotation_task.cancel()
\ No newline at end of file
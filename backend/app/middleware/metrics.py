@@ -0,0 +1,102 @@
+import time
+from typing import Any, Dict, List
+
+from app.core.auth import verified_token_cache
+from app.core.metrics import (
+    db_queries_per_request,
+    db_time_per_request,
+    http_request_duration,
+    http_requests_in_flight,
+    http_requests_total,
+    render_counter,
+    render_gauge,
+    request_db_stats,
+)
+from app.core.pubsub import broker
+from app.core.rate_limit import rate_limiter
+from app.core.security import password_hasher
+from app.db.session import pool_stats
+from app.services.attendance import mark_writer
+from app.services.audit import audit_writer
+from app.services.principal_cache import principal_cache
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware) que registra latencia,
+    conteo por status, requests en curso y uso de base de datos por ruta.
+    La ruta se reporta con su template (/tenants/{tenant_id}) para acotar
+    la cardinalidad.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        db_stats = [0, 0.0]
+        token = request_db_stats.set(db_stats)
+        http_requests_in_flight.value += 1
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.value -= 1
+            request_db_stats.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, path, str(status_code))
+            http_request_duration.observe(time.perf_counter() - started, method, path)
+            db_queries_per_request.observe(db_stats[0], path)
+            db_time_per_request.observe(db_stats[1], path)
+
+
+# Valores de stats() que suben y bajan; el resto son contadores acumulados
+_GAUGE_STATS = {"size", "keys", "subscriptions", "channels", "queued", "buffered", "spool_bytes"}
+
+
+def _render_stats(prefix: str, help: str, stats: Dict[str, Any]) -> List[str]:
+    lines: List[str] = []
+    for key, value in stats.items():
+        render = render_gauge if key in _GAUGE_STATS else render_counter
+        lines.extend(render(f"{prefix}_{key}", f"{help}: {key}", {(): value}))
+    return lines
+
+
+def runtime_metrics() -> List[str]:
+    """
+    Métricas que se leen al momento del scrape: pools, caches y hashing
+    """
+    lines: List[str] = []
+
+    pools = pool_stats()
+    for name, key in (("db_pool_checked_out", "checked_out"), ("db_pool_overflow", "overflow")):
+        samples = {(("engine", engine),): stats[key] for engine, stats in pools.items() if key in stats}
+        lines.extend(render_gauge(name, f"Pool de conexiones: {key}", samples))
+    samples = {(("engine", engine),): stats["timeouts"] for engine, stats in pools.items() if "timeouts" in stats}
+    lines.extend(render_counter("db_pool_timeouts", "Pool de conexiones: timeouts", samples))
+
+    hasher = password_hasher.stats()
+    lines.extend(render_gauge("password_hash_pending", "Hashes en curso o en cola", {(): hasher["pending"]}))
+    lines.extend(render_counter("password_hash_rejected", "Hashes rechazados por cola llena", {(): hasher["rejected"]}))
+
+    for cache_name, cache in (("token", verified_token_cache), ("principal", principal_cache)):
+        lines.extend(_render_stats(f"{cache_name}_cache", f"Cache de {cache_name}", cache.stats()))
+
+    lines.extend(_render_stats("rate_limit", "Límite de intentos", rate_limiter.stats()))
+    lines.extend(_render_stats("realtime", "Tiempo real", broker.stats()))
+    lines.extend(_render_stats("attendance", "Marcaciones", mark_writer.stats()))
+    lines.extend(_render_stats("audit", "Auditoría", audit_writer.stats()))
+    return lines
\ No newline at end of file
@@ -0,0 +1,36 @@
+from enum import IntEnum
+
+from sqlalchemy import BigInteger, Column, Float, Integer, SmallInteger, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class MarkType(IntEnum):
+    ENTRADA = 1
+    SALIDA = 2
+
+class AttendanceMark(Base):
+    """
+    Marcación de asistencia. Solo se inserta (en lotes); client_mark_id la
+    genera el dispositivo y hace idempotentes los reintentos
+    """
+    __tablename__ = "attendance_marks"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    client_mark_id = Column(String(36), nullable=False)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    guard_id = Column(Integer, ForeignKey("guards.id", ondelete="CASCADE"), nullable=False)
+    installation_id = Column(Integer, ForeignKey("installations.id", ondelete="CASCADE"), nullable=False)
+    mark_type = Column(SmallInteger, nullable=False)
+    method = Column(String(16), nullable=False)
+    marked_at = Column(DateTime(timezone=True), nullable=False)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Usuario autenticado que envió la marcación
+    submitted_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_attendance_marks_client_mark_id", "client_mark_id", unique=True),
+        Index("ix_attendance_marks_guard_id_marked_at", "guard_id", "marked_at"),
+        Index("ix_attendance_marks_installation_id_marked_at", "installation_id", "marked_at"),
+    )
\ No newline at end of file
@@ -0,0 +1,30 @@
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.session import Base
+
+class AuditLog(Base):
+    """
+    Registro de auditoría de cambios en entidades (ver app/services/audit.py).
+    Sin claves foráneas: el registro debe sobrevivir a la eliminación del
+    tenant o del usuario al que se refiere
+    """
+    __tablename__ = "audit_logs"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    # Generado al capturar el cambio: hace idempotente la reescritura desde el spool
+    entry_id = Column(String(36), nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    tenant_id = Column(Integer, nullable=True)
+    actor_id = Column(Integer, nullable=True)
+    action = Column(String(16), nullable=False)
+    entity = Column(String(32), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    # {"before": {...}, "after": {...}} con las columnas cambiadas
+    changes = Column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_audit_logs_entry_id", "entry_id", unique=True),
+        Index("ix_audit_logs_tenant_id_occurred_at", "tenant_id", "occurred_at"),
+        Index("ix_audit_logs_actor_id_occurred_at", "actor_id", "occurred_at"),
+        Index("ix_audit_logs_occurred_at", "occurred_at"),
+    )
\ No newline at end of file
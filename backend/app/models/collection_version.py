@@ -0,0 +1,15 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+
+from app.db.session import Base
+
+class CollectionVersion(Base):
+    """
+    Versión de un listado (p.ej. "tenants"). Se incrementa en la misma
+    transacción que cada escritura del listado, así que sirve de validador
+    para su ETag sin recorrer la tabla
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
\ No newline at end of file
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from app.db.session import Base
+
+class InstallationCoverage(Base):
+    """
+    Guardias en turno (día/noche) por instalación y día. Se mantiene de forma
+    incremental al guardar la pauta; los días sin fila tienen cobertura 0
+    """
+    __tablename__ = "installation_coverage"
+
+    installation_id = Column(Integer, ForeignKey("installations.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    covered = Column(Integer, nullable=False, default=0)
+
+class TenantCoverage(Base):
+    """
+    Puestos cubiertos del tenant por día: suma de min(cubiertos, requeridos)
+    de sus instalaciones activas. PPC = requeridos del tenant - covered
+    """
+    __tablename__ = "tenant_coverage"
+
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    covered = Column(Integer, nullable=False, default=0)
\ No newline at end of file
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Index, cast
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.session import Base
+from app.schemas.tenant import formatear_rut, normalizar_rut
+
+class Guard(Base):
+    __tablename__ = "guards"
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    # Instalación base: define en qué pauta mensual aparece el guardia
+    installation_id = Column(Integer, ForeignKey("installations.id", ondelete="SET NULL"), nullable=True)
+    nombre = Column(String, nullable=False)
+    apellido = Column(String, nullable=False)
+    rut_numero = Column(Integer, nullable=False)
+    rut_dv = Column(String(1), nullable=False)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    tenant = relationship("Tenant", back_populates="guards")
+    installation = relationship("Installation", back_populates="guards")
+
+    @hybrid_property
+    def rut(self):
+        if self.rut_numero is None:
+            return None
+        return formatear_rut(self.rut_numero, self.rut_dv)
+
+    @rut.setter
+    def rut(self, value):
+        normalizado = normalizar_rut(value)
+        if normalizado is None:
+            raise ValueError('RUT inválido')
+        self.rut_numero, self.rut_dv = normalizado
+
+    @rut.expression
+    def rut(cls):
+        return cast(cls.rut_numero, String) + cls.rut_dv
+
+    __table_args__ = (
+        Index("ix_guards_tenant_id_rut_numero", "tenant_id", "rut_numero", unique=True),
+        Index("ix_guards_installation_id", "installation_id"),
+    )
\ No newline at end of file
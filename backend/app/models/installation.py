@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class Installation(Base):
+    __tablename__ = "installations"
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String, nullable=False)
+    address = Column(String, nullable=True)
+    # Puestos a cubrir por día (base para el cálculo de PPC)
+    required_guards = Column(Integer, nullable=False, default=1)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    tenant = relationship("Tenant", back_populates="installations")
+    guards = relationship("Guard", back_populates="installation", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_installations_tenant_id_name", "tenant_id", "name"),
+    )
\ No newline at end of file
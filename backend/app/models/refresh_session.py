@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+
+class RefreshSession(Base):
+    """
+    Un refresh token emitido. Cada rotación crea una fila nueva en la misma
+    familia y marca la anterior como usada; presentar un token ya usado
+    revoca la familia completa
+    """
+    __tablename__ = "refresh_sessions"
+
+    jti = Column(String(36), primary_key=True)
+    family_id = Column(String(36), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
@@ -0,0 +1,42 @@
+from enum import IntEnum
+
+from sqlalchemy import Column, Float, Integer, SmallInteger, String, DateTime, ForeignKey, Index, PrimaryKeyConstraint
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class RoundEventType(IntEnum):
+    GPS = 1
+    QR = 2
+
+class RoundEvent(Base):
+    """
+    Evento de ronda (posición GPS o lectura de un punto de control QR).
+    Solo se inserta. En PostgreSQL la tabla está particionada por rango de
+    recorded_at (ver app/services/rounds.py); en SQLite es una tabla normal.
+
+    La clave primaria sirve también para las consultas por instalación y
+    rango de fechas, e incluye la columna de partición como exige PostgreSQL.
+    event_id lo genera el dispositivo y hace idempotentes los reintentos
+    """
+    __tablename__ = "round_events"
+
+    installation_id = Column(Integer, ForeignKey("installations.id", ondelete="CASCADE"), nullable=False)
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    event_id = Column(String(36), nullable=False)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    guard_id = Column(Integer, ForeignKey("guards.id", ondelete="CASCADE"), nullable=False)
+    event_type = Column(SmallInteger, nullable=False)
+    # Contenido del código QR leído (solo eventos QR)
+    checkpoint = Column(String(64), nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # Precisión del GPS en metros
+    accuracy = Column(Float, nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("installation_id", "recorded_at", "event_id"),
+        # BRIN: mínimo costo de inserción y sirve para barridos por tiempo de todo el tenant
+        Index("ix_round_events_recorded_at", "recorded_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
\ No newline at end of file
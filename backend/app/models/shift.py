@@ -0,0 +1,40 @@
+from enum import IntEnum
+
+from sqlalchemy import Column, Integer, SmallInteger, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class ShiftType(IntEnum):
+    """
+    Códigos de turno de la pauta. 0 es "sin asignar" y no se guarda como fila
+    """
+    SIN_ASIGNAR = 0
+    DIA = 1
+    NOCHE = 2
+    LIBRE = 3
+    VACACIONES = 4
+    LICENCIA = 5
+    PERMISO = 6
+
+# Turnos que ocupan un puesto (los demás son ausencias planificadas)
+WORKING_SHIFT_TYPES = (ShiftType.DIA, ShiftType.NOCHE)
+
+class Shift(Base):
+    """
+    Un día de la pauta de un guardia: a lo más un turno por guardia y día
+    """
+    __tablename__ = "shifts"
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    installation_id = Column(Integer, ForeignKey("installations.id", ondelete="CASCADE"), nullable=False)
+    guard_id = Column(Integer, ForeignKey("guards.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    shift_type = Column(SmallInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_shifts_guard_id_date", "guard_id", "date", unique=True),
+        Index("ix_shifts_installation_id_date", "installation_id", "date"),
+        Index("ix_shifts_tenant_id_date", "tenant_id", "date"),
+    )
\ No newline at end of file
@@ -1,17 +1,55 @@
-from sqlalchemy import Column, String, Boolean, Integer, DateTime
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Index, cast
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
+from app.schemas.tenant import formatear_rut, normalizar_rut
 
 class Tenant(Base):
     __tablename__ = "tenants"
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
-    rut = Column(String, unique=True, nullable=False)
+    # RUT normalizado: cuerpo numérico (índice único) + dígito verificador
+    rut_numero = Column(Integer, nullable=False)
+    rut_dv = Column(String(1), nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relación con usuarios
-    users = relationship("User", back_populates="tenant") 
\ No newline at end of file
+    users = relationship("User", back_populates="tenant")
+    # Las filas dependientes las borra el ON DELETE CASCADE de la base
+    installations = relationship("Installation", back_populates="tenant", passive_deletes=True)
+    guards = relationship("Guard", back_populates="tenant", passive_deletes=True)
+
+    @hybrid_property
+    def rut(self):
+        if self.rut_numero is None:
+            return None
+        return formatear_rut(self.rut_numero, self.rut_dv)
+
+    @rut.setter
+    def rut(self, value):
+        normalizado = normalizar_rut(value)
+        if normalizado is None:
+            raise ValueError('RUT inválido')
+        self.rut_numero, self.rut_dv = normalizado
+
+    @rut.expression
+    def rut(cls):
+        return cast(cls.rut_numero, String) + cls.rut_dv
+
+    # Índices para paginación por cursor (keyset) y filtros del listado
+    __table_args__ = (
+        Index("ix_tenants_rut_numero", "rut_numero", unique=True),
+        Index("ix_tenants_created_at_id", "created_at", "id"),
+        Index("ix_tenants_name_id", "name", "id"),
+        Index("ix_tenants_is_active_created_at_id", "is_active", "created_at", "id"),
+        Index("ix_tenants_updated_at", "updated_at"),
+        Index(
+            "ix_tenants_lower_name",
+            func.lower(name).label("lower_name"),
+            postgresql_ops={"lower_name": "text_pattern_ops"},
+        ),
+    ) 
\ No newline at end of file
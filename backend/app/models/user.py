@@ -1,10 +1,15 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey
-from sqlalchemy.orm import Session, relationship
+from typing import Optional
+
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Index, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db.session import Base
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 
 class User(Base):
     __tablename__ = "users"
@@ -23,22 +28,46 @@ class User(Base):
     # Relación con tenant (si aplica)
     tenant = relationship("Tenant", back_populates="users")
 
+    __table_args__ = (
+        # Un email por usuario sin importar mayúsculas; lo usan login y signup
+        Index("ix_users_email_lower", func.lower(email), unique=True),
+    )
+
     @classmethod
-    def get_by_email(cls, db: Session, email: str):
-        return db.query(cls).filter(cls.email == email).first()
+    async def get_by_email(cls, db: AsyncSession, email: str):
+        result = await db.execute(select(cls).where(func.lower(cls.email) == email.lower()))
+        return result.scalars().first()
 
     @classmethod
-    def create(cls, db: Session, obj_in: UserCreate):
-        db_obj = cls(
-            email=obj_in.email,
-            hashed_password=get_password_hash(obj_in.password),
-            nombre=obj_in.nombre,
-            apellido=obj_in.apellido,
-            is_active=obj_in.is_active,
-            is_superadmin=obj_in.is_superadmin,
-            tenant_id=obj_in.tenant_id
+    async def create(cls, db: AsyncSession, obj_in: UserCreate) -> Optional["User"]:
+        """
+        Inserta el usuario en un solo round trip (INSERT ... ON CONFLICT DO
+        NOTHING RETURNING), sin consulta previa ni refresh. Devuelve None si
+        el email ya está registrado (sin importar mayúsculas)
+        """
+        # Import local: el módulo de auditoría importa este modelo
+        from app.services.audit import record_insert
+
+        hashed_password = await get_password_hash_async(obj_in.password)
+        insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = (
+            insert(cls)
+            .values(
+                email=obj_in.email,
+                hashed_password=hashed_password,
+                nombre=obj_in.nombre,
+                apellido=obj_in.apellido,
+                is_active=obj_in.is_active,
+                is_superadmin=obj_in.is_superadmin,
+                tenant_id=obj_in.tenant_id,
+            )
+            .on_conflict_do_nothing()
+            .returning(cls)
         )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj 
\ No newline at end of file
+        db_obj = (await db.scalars(statement)).first()
+        if db_obj is None:
+            await db.rollback()
+            return None
+        record_insert(db, db_obj)
+        await db.commit()
+        return db_obj
\ No newline at end of file
@@ -0,0 +1,28 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.models.user import User as UserModel
+from app.schemas.attendance import AttendanceBatchIn, AttendanceMarkResult
+from app.services.attendance import mark_writer
+from app.services.auth import get_current_user
+
+router = APIRouter()
+
+@router.post("/marks", response_model=List[AttendanceMarkResult])
+async def create_marks(
+    *,
+    batch_in: AttendanceBatchIn,
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Registra marcaciones de entrada/salida. La respuesta llega después del
+    commit del lote que las contiene: "created" y "duplicate" (mismo
+    client_mark_id ya registrado) significan que la marcación está persistida
+    y el dispositivo puede descartarla; "rejected" no se reintenta
+    """
+    if not current_user.is_superadmin and current_user.tenant_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="El usuario no pertenece a un tenant",
+        )
+    return await mark_writer.submit(batch_in.marks, current_user)
\ No newline at end of file
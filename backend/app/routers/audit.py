@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import FastJSONResponse
+from app.db.session import get_async_db
+from app.models.user import User as UserModel
+from app.services.audit import query_audit_log
+from app.services.auth import ensure_tenant_access, get_current_user
+
+router = APIRouter()
+
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    if moment is None:
+        return None
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+@router.get("/")
+async def read_audit_log(
+    tenant_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    entity: Optional[Literal["tenant", "user"]] = None,
+    entity_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Registro de auditoría, más reciente primero. El superadmin consulta
+    todo; el resto de los usuarios solo su tenant (tenant_id obligatorio).
+    El cursor de la página siguiente se devuelve en el header X-Next-Cursor
+    """
+    if not current_user.is_superadmin:
+        if tenant_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="tenant_id es obligatorio",
+            )
+        ensure_tenant_access(current_user, tenant_id)
+
+    before = None
+    if cursor:
+        occurred_at, last_id = decode_cursor(cursor, (datetime, int))
+        before = (_utc(occurred_at), last_id)
+    entries = await query_audit_log(
+        db, tenant_id, actor_id, entity, entity_id, _utc(start), _utc(end), limit, before
+    )
+    headers = {}
+    if len(entries) == limit:
+        headers["X-Next-Cursor"] = encode_cursor([entries[-1]["occurred_at"], entries[-1]["id"]])
+    return FastJSONResponse(entries, headers=headers)
\ No newline at end of file
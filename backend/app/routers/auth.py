@@ -1,34 +1,56 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.rate_limit import enforce_rate_limit
+from app.db.session import get_async_db
 from app.models.user import User as UserModel
 from app.schemas.user import User, UserCreate
 from app.services.auth import authenticate_user, get_current_user
 from app.core.auth import TokenManager
+from app.services.refresh_sessions import open_session, revoke_family, rotate_session
+from app.services.revocation import revoke_token
 
 router = APIRouter()
 
+def _set_refresh_cookie(response: Response, refresh_token: str) -> None:
+    # Cookie segura para el refresh token
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        httponly=True,
+        secure=not settings.DEBUG,  # True en producción
+        samesite="lax",
+        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    )
+
 @router.post("/signup", response_model=User)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = UserModel.get_by_email(db, email=user.email)
-    if db_user:
+async def signup(request: Request, user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # Antes de cualquier query o hash: un intento rechazado no cuesta bcrypt
+    await enforce_rate_limit(request, "signup", settings.RATE_LIMIT_SIGNUP_PER_IP)
+    # Sin consulta previa: el índice único sobre lower(email) resuelve la carrera entre signups
+    db_user = await UserModel.create(db=db, obj_in=user)
+    if db_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    return UserModel.create(db=db, obj_in=user)
+    return db_user
 
 @router.post("/login")
-def login(
+async def login(
+    request: Request,
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    await enforce_rate_limit(
+        request, "login", settings.RATE_LIMIT_LOGIN_PER_IP,
+        form_data.username, settings.RATE_LIMIT_LOGIN_PER_ACCOUNT,
+    )
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,18 +58,9 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Generar tokens
-    tokens = TokenManager.create_tokens(user)
-    
-    # Configurar cookie segura para el refresh token
-    response.set_cookie(
-        key="refresh_token",
-        value=tokens["refresh_token"],
-        httponly=True,
-        secure=not settings.DEBUG,  # True en producción
-        samesite="lax",
-        max_age=7 * 24 * 60 * 60  # 7 días
-    )
+    # Generar tokens y registrar la sesión de refresh
+    tokens = await open_session(db, user)
+    _set_refresh_cookie(response, tokens["refresh_token"])
     
     return {
         "access_token": tokens["access_token"],
@@ -56,28 +69,24 @@ def login(
     }
 
 @router.post("/refresh")
-def refresh_token(
+async def refresh_token(
+    request: Request,
     response: Response,
-    refresh_token: str = Depends(lambda x: x.cookies.get("refresh_token"))
+    db: AsyncSession = Depends(get_async_db)
 ):
+    """
+    Rota el refresh token de la cookie: sin hashing de contraseña, solo una
+    lectura/actualización por PK en refresh_sessions
+    """
+    refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token not found"
         )
     
-    # Generar nuevo access token
-    new_tokens = TokenManager.refresh_access_token(refresh_token)
-    
-    # Actualizar cookie del refresh token
-    response.set_cookie(
-        key="refresh_token",
-        value=new_tokens["refresh_token"],
-        httponly=True,
-        secure=not settings.DEBUG,
-        samesite="lax",
-        max_age=7 * 24 * 60 * 60
-    )
+    new_tokens = await rotate_session(db, refresh_token)
+    _set_refresh_cookie(response, new_tokens["refresh_token"])
     
     return {
         "access_token": new_tokens["access_token"],
@@ -86,10 +95,34 @@ def refresh_token(
     }
 
 @router.post("/logout")
-def logout(response: Response):
+async def logout(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Invalida el refresh token eliminando la cookie
+    Revoca el access token (si viene en el header) y la sesión del refresh
+    token, y elimina la cookie
     """
+    scheme, access_token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    tokens = (
+        (access_token if scheme.lower() == "bearer" else None, "access"),
+        (request.cookies.get("refresh_token"), "refresh"),
+    )
+    for token, token_type in tokens:
+        if not token:
+            continue
+        try:
+            payload = TokenManager.verify_token(token, token_type)
+        except HTTPException:
+            # Token inválido, expirado o ya revocado: no hay nada que revocar
+            continue
+        if token_type == "refresh" and payload.get("fam"):
+            # Cerrar la sesión invalida toda la familia de refresh tokens
+            await revoke_family(db, payload["fam"])
+        else:
+            await revoke_token(db, payload)
+
     response.delete_cookie(
         key="refresh_token",
         httponly=True,
@@ -99,5 +132,5 @@ def logout(response: Response):
     return {"message": "Successfully logged out"}
 
 @router.get("/me", response_model=User)
-def read_users_me(current_user: UserModel = Depends(get_current_user)):
+async def read_users_me(current_user: UserModel = Depends(get_current_user)):
     return current_user 
\ No newline at end of file
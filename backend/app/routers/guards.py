@@ -0,0 +1,99 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from app.db.session import get_async_db
+from app.models.guard import Guard as GuardModel
+from app.models.installation import Installation as InstallationModel
+from app.models.user import User as UserModel
+from app.schemas.guard import Guard, GuardCreate, GuardUpdate
+from app.services.auth import ensure_tenant_access, get_current_user
+
+router = APIRouter()
+
+async def _check_installation(db: AsyncSession, installation_id: Optional[int], tenant_id: int) -> None:
+    if installation_id is None:
+        return
+    installation = await db.get(InstallationModel, installation_id)
+    if not installation or installation.tenant_id != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La instalación no pertenece al tenant",
+        )
+
+async def _get_guard(db: AsyncSession, guard_id: int, user: UserModel) -> GuardModel:
+    guard = await db.get(GuardModel, guard_id)
+    if not guard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Guardia no encontrado",
+        )
+    ensure_tenant_access(user, guard.tenant_id)
+    return guard
+
+@router.post("/", response_model=Guard)
+async def create_guard(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    guard_in: GuardCreate,
+    current_user: UserModel = Depends(get_current_user),
+):
+    ensure_tenant_access(current_user, guard_in.tenant_id)
+    await _check_installation(db, guard_in.installation_id, guard_in.tenant_id)
+    try:
+        guard = GuardModel(**guard_in.dict())
+        db.add(guard)
+        await db.commit()
+        await db.refresh(guard)
+        return guard
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ya existe un guardia con este RUT en el tenant",
+        )
+
+@router.get("/", response_model=List[Guard])
+async def read_guards(
+    db: AsyncSession = Depends(get_async_db),
+    tenant_id: int = Query(...),
+    installation_id: Optional[int] = None,
+    is_active: Optional[bool] = None,
+    current_user: UserModel = Depends(get_current_user),
+):
+    ensure_tenant_access(current_user, tenant_id)
+    query = select(GuardModel).where(GuardModel.tenant_id == tenant_id)
+    if installation_id is not None:
+        query = query.where(GuardModel.installation_id == installation_id)
+    if is_active is not None:
+        query = query.where(GuardModel.is_active == is_active)
+    result = await db.execute(query.order_by(GuardModel.apellido, GuardModel.nombre, GuardModel.id))
+    return result.scalars().all()
+
+@router.get("/{guard_id}", response_model=Guard)
+async def read_guard(
+    guard_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    return await _get_guard(db, guard_id, current_user)
+
+@router.put("/{guard_id}", response_model=Guard)
+async def update_guard(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    guard_id: int,
+    guard_in: GuardUpdate,
+    current_user: UserModel = Depends(get_current_user),
+):
+    guard = await _get_guard(db, guard_id, current_user)
+    update_data = guard_in.dict(exclude_unset=True)
+    if "installation_id" in update_data:
+        await _check_installation(db, update_data["installation_id"], guard.tenant_id)
+    for field, value in update_data.items():
+        setattr(guard, field, value)
+    await db.commit()
+    await db.refresh(guard)
+    return guard
\ No newline at end of file
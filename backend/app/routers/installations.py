@@ -0,0 +1,185 @@
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.responses import FastJSONResponse
+from app.db.session import get_async_db
+from app.models.installation import Installation as InstallationModel
+from app.models.tenant import Tenant as TenantModel
+from app.models.user import User as UserModel
+from app.schemas.installation import Installation, InstallationCreate, InstallationUpdate
+from app.schemas.roster import RosterAssign, RosterEdit, _shift_code
+from app.services.auth import ensure_tenant_access, get_current_user
+from app.services.coverage import check_range, installation_uncovered, rebuild_tenant_totals
+from app.services.realtime import publish_roster_changes
+from app.services.roster import Roster
+from app.services.rounds import check_event_range, installation_events
+
+router = APIRouter()
+
+async def get_installation(db: AsyncSession, installation_id: int, user: UserModel) -> InstallationModel:
+    installation = await db.get(InstallationModel, installation_id)
+    if not installation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instalación no encontrada",
+        )
+    ensure_tenant_access(user, installation.tenant_id)
+    return installation
+
+@router.post("/", response_model=Installation)
+async def create_installation(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    installation_in: InstallationCreate,
+    current_user: UserModel = Depends(get_current_user),
+):
+    ensure_tenant_access(current_user, installation_in.tenant_id)
+    if not await db.get(TenantModel, installation_in.tenant_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tenant no encontrado",
+        )
+    installation = InstallationModel(**installation_in.dict())
+    db.add(installation)
+    await db.commit()
+    await db.refresh(installation)
+    return installation
+
+@router.get("/", response_model=List[Installation])
+async def read_installations(
+    db: AsyncSession = Depends(get_async_db),
+    tenant_id: int = Query(...),
+    is_active: Optional[bool] = None,
+    current_user: UserModel = Depends(get_current_user),
+):
+    ensure_tenant_access(current_user, tenant_id)
+    query = select(InstallationModel).where(InstallationModel.tenant_id == tenant_id)
+    if is_active is not None:
+        query = query.where(InstallationModel.is_active == is_active)
+    result = await db.execute(query.order_by(InstallationModel.name, InstallationModel.id))
+    return result.scalars().all()
+
+@router.get("/{installation_id}", response_model=Installation)
+async def read_installation(
+    installation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    return await get_installation(db, installation_id, current_user)
+
+@router.put("/{installation_id}", response_model=Installation)
+async def update_installation(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    installation_id: int,
+    installation_in: InstallationUpdate,
+    current_user: UserModel = Depends(get_current_user),
+):
+    installation = await get_installation(db, installation_id, current_user)
+    update_data = installation_in.dict(exclude_unset=True)
+    coverage_changed = any(
+        field in update_data and update_data[field] != getattr(installation, field)
+        for field in ("required_guards", "is_active")
+    )
+    for field, value in update_data.items():
+        setattr(installation, field, value)
+    if coverage_changed:
+        # Cambia el aporte de la instalación a los puestos cubiertos del tenant
+        await db.flush()
+        await rebuild_tenant_totals(db, installation.tenant_id)
+    await db.commit()
+    await db.refresh(installation)
+    return installation
+
+@router.get("/{installation_id}/coverage")
+async def read_installation_coverage(
+    installation_id: int,
+    start: date,
+    end: date,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Puestos requeridos, cubiertos y por cubrir (PPC) por día
+    """
+    check_range(start, end)
+    installation = await get_installation(db, installation_id, current_user)
+    return FastJSONResponse(await installation_uncovered(db, installation, start, end))
+
+@router.get("/{installation_id}/rounds")
+async def read_round_events(
+    installation_id: int,
+    start: datetime,
+    end: datetime,
+    guard_id: Optional[int] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Eventos de ronda de la instalación en [start, end), en orden cronológico.
+    El cursor de la página siguiente se devuelve en el header X-Next-Cursor
+    """
+    start, end = check_event_range(start, end)
+    await get_installation(db, installation_id, current_user)
+    after = None
+    if cursor:
+        recorded_at, event_id = decode_cursor(cursor, (datetime, str))
+        after = (recorded_at, event_id)
+    events = await installation_events(db, installation_id, start, end, guard_id, limit, after)
+    headers = {}
+    if len(events) == limit:
+        headers["X-Next-Cursor"] = encode_cursor([events[-1]["recorded_at"], events[-1]["event_id"]])
+    return FastJSONResponse(events, headers=headers)
+
+@router.get("/{installation_id}/roster")
+async def read_roster(
+    installation_id: int,
+    year: int = Query(..., ge=2000, le=2100),
+    month: int = Query(..., ge=1, le=12),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Pauta mensual de la instalación: una fila de letras por guardia
+    """
+    installation = await get_installation(db, installation_id, current_user)
+    roster = await Roster.load(db, installation, year, month)
+    return FastJSONResponse(roster.render())
+
+@router.patch("/{installation_id}/roster")
+async def edit_roster(
+    installation_id: int,
+    edit: RosterEdit,
+    year: int = Query(..., ge=2000, le=2100),
+    month: int = Query(..., ge=1, le=12),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Aplica asignaciones y patrones en orden sobre la pauta del mes y guarda
+    solo las celdas que cambiaron
+    """
+    installation = await get_installation(db, installation_id, current_user)
+    roster = await Roster.load(db, installation, year, month)
+    try:
+        for operation in edit.operations:
+            shift_type = _shift_code(operation.shift_type)
+            if isinstance(operation, RosterAssign):
+                roster.assign(operation.guard_ids, operation.start, operation.end, shift_type)
+            else:
+                roster.fill_pattern(
+                    operation.guard_ids, operation.pattern, operation.start, shift_type, operation.stagger
+                )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    cells = roster.changed_cells()
+    changes = await roster.save(db)
+    await publish_roster_changes(roster, cells, changes["moved_from"])
+    return FastJSONResponse({**roster.render(), "changes": changes})
\ No newline at end of file
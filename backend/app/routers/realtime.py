@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import Any, Dict, Tuple
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import select
+
+from app.core.auth import TokenManager
+from app.core.config import settings
+from app.core.pubsub import Subscription, broker
+from app.core.revocation import revocation_list
+from app.db.session import AsyncSessionLocal
+from app.models.installation import Installation
+from app.models.user import User
+from app.services.auth import ensure_tenant_access
+from app.services.principal_cache import cache_principal, get_principal
+from app.services.realtime import installation_channel, tenant_channel
+
+router = APIRouter()
+
+# Códigos de cierre de aplicación (rango 4000-4999)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_NOT_FOUND = 4404
+CLOSE_SLOW_CONSUMER = 4408
+
+async def _authenticate(token: str) -> Tuple[User, Dict[str, Any]]:
+    """
+    Mismo JWT que la API REST (en query string: el navegador no permite
+    headers en el handshake). Devuelve el usuario y el payload del token
+    """
+    payload = TokenManager.verify_token(token, "access")
+    user_id = int(payload["sub"])
+    user = get_principal(user_id)
+    if user is None:
+        async with AsyncSessionLocal() as db:
+            user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+        if user is not None:
+            cache_principal(user)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+    return user, payload
+
+async def _send_loop(websocket: WebSocket, subscription: Subscription, token: Dict[str, Any]) -> None:
+    expires_at = float(token["exp"])
+    while True:
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            await websocket.close(code=CLOSE_UNAUTHORIZED, reason="Token expirado")
+            return
+        # El token se validó en el handshake: un logout posterior corta la conexión en el
+        # próximo ciclo (a lo más REVOCATION_SYNC_SECONDS, lo que tarda en llegar de otro worker)
+        if revocation_list.is_revoked(token.get("jti")):
+            await websocket.close(code=CLOSE_UNAUTHORIZED, reason="Token revocado")
+            return
+        try:
+            batch = await asyncio.wait_for(
+                subscription.next_batch(settings.REALTIME_MAX_BATCH),
+                min(remaining, settings.REVOCATION_SYNC_SECONDS),
+            )
+        except asyncio.TimeoutError:
+            continue
+        try:
+            # Un frame por lote; si el cliente no lo recibe a tiempo se desconecta
+            await asyncio.wait_for(
+                websocket.send_text(orjson.dumps(batch).decode()),
+                settings.REALTIME_SEND_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            broker.slow_disconnects += 1
+            await websocket.close(code=CLOSE_SLOW_CONSUMER, reason="Cliente lento")
+            return
+
+async def _receive_loop(websocket: WebSocket) -> None:
+    # Los mensajes del cliente solo se usan como keep-alive
+    try:
+        while True:
+            message = await websocket.receive_text()
+            if message == "ping":
+                await websocket.send_text('{"type":"pong"}')
+    except WebSocketDisconnect:
+        return
+
+async def _serve(websocket: WebSocket, channel: str, token: Dict[str, Any]) -> None:
+    await websocket.accept()
+    subscription = broker.subscribe([channel])
+    await websocket.send_text(orjson.dumps([{"type": "subscribed", "channel": channel}]).decode())
+    tasks = {
+        asyncio.create_task(_send_loop(websocket, subscription, token)),
+        asyncio.create_task(_receive_loop(websocket)),
+    }
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        broker.unsubscribe(subscription)
+
+@router.websocket("/tenants/{tenant_id}")
+async def tenant_updates(websocket: WebSocket, tenant_id: int, token: str = Query(...)):
+    """
+    Cambios de pauta de todas las instalaciones del tenant
+    """
+    try:
+        user, payload = await _authenticate(token)
+        ensure_tenant_access(user, tenant_id)
+    except HTTPException as e:
+        code = CLOSE_FORBIDDEN if e.status_code == status.HTTP_403_FORBIDDEN else CLOSE_UNAUTHORIZED
+        await websocket.close(code=code, reason=str(e.detail))
+        return
+    await _serve(websocket, tenant_channel(tenant_id), payload)
+
+@router.websocket("/installations/{installation_id}")
+async def installation_updates(websocket: WebSocket, installation_id: int, token: str = Query(...)):
+    """
+    Cambios de pauta de una instalación
+    """
+    try:
+        user, payload = await _authenticate(token)
+        async with AsyncSessionLocal() as db:
+            installation = await db.get(Installation, installation_id)
+        if installation is None:
+            await websocket.close(code=CLOSE_NOT_FOUND, reason="Instalación no encontrada")
+            return
+        ensure_tenant_access(user, installation.tenant_id)
+    except HTTPException as e:
+        code = CLOSE_FORBIDDEN if e.status_code == status.HTTP_403_FORBIDDEN else CLOSE_UNAUTHORIZED
+        await websocket.close(code=code, reason=str(e.detail))
+        return
+    await _serve(websocket, installation_channel(installation_id), payload)
\ No newline at end of file
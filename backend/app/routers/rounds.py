@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_async_db
+from app.models.user import User as UserModel
+from app.schemas.round_event import RoundAppendResult, RoundEventBatchIn
+from app.services.auth import get_current_user
+from app.services.rounds import append_events
+
+router = APIRouter()
+
+@router.post("/events", response_model=RoundAppendResult)
+async def create_round_events(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    batch_in: RoundEventBatchIn,
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Agrega un lote de eventos de ronda (GPS y lecturas QR) en una sola
+    sentencia. Los reintentos de eventos ya registrados cuentan como duplicate
+    """
+    return await append_events(db, batch_in.events, current_user)
\ No newline at end of file
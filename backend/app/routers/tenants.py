@@ -1,20 +1,29 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from app.db.session import get_db
+from app.core.http_cache import make_etag, etag_matches, not_modified, set_cache_headers
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.db.session import get_async_db
 from app.models.tenant import Tenant as TenantModel
 from app.models.user import User as UserModel
-from app.schemas.tenant import TenantCreate, TenantUpdate, Tenant
-from app.services.auth import get_current_superadmin
+from app.schemas.tenant import TenantCreate, TenantUpdate, Tenant, formatear_rut, normalizar_rut
+from app.services.auth import ensure_tenant_access, get_current_superadmin, get_current_user
+from app.services.collection_versions import get_collection_version
+from app.services.coverage import check_range, tenant_uncovered
+from app.services.tenant_import import import_tenants
 
 router = APIRouter()
 
 @router.post("/", response_model=Tenant)
-def create_tenant(
+async def create_tenant(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     tenant_in: TenantCreate,
     current_user: UserModel = Depends(get_current_superadmin),
 ):
@@ -25,50 +34,301 @@ def create_tenant(
             is_active=tenant_in.is_active,
         )
         db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+        await db.commit()
+        await db.refresh(tenant)
         return tenant
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ya existe un tenant con este RUT",
         )
 
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+@router.post("/import")
+async def import_tenants_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_superadmin),
+):
+    """
+    Importa tenants en bloque desde un body CSV (header name,rut,is_active)
+    o NDJSON, procesado en streaming e insertado por lotes. Devuelve el
+    resumen con los errores por línea.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Formato no soportado, use text/csv o application/x-ndjson",
+        )
+    return await import_tenants(db, request.stream(), fmt)
+
+SORT_COLUMNS = {
+    "created_at": TenantModel.created_at,
+    "name": TenantModel.name,
+}
+
+async def _approximate_total(db: AsyncSession, query, filtered: bool) -> int:
+    """
+    Total de tenants: en Postgres sin filtros usa la estimación del planner
+    (pg_class.reltuples), que no recorre la tabla
+    """
+    if not filtered and db.bind.dialect.name == "postgresql":
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'tenants'")
+        )
+        estimate = result.scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+    result = await db.execute(select(func.count()).select_from(query.subquery()))
+    return result.scalar_one()
+
+# Columnas que expone el schema Tenant; el listado rápido solo selecciona estas
+TENANT_LIST_COLUMNS = (
+    TenantModel.id,
+    TenantModel.name,
+    TenantModel.rut_numero,
+    TenantModel.rut_dv,
+    TenantModel.is_active,
+    TenantModel.created_at,
+    TenantModel.updated_at,
+)
+
+def _fast_tenant_list(rows, response: Response) -> FastJSONResponse:
+    """
+    Serializa filas de TENANT_LIST_COLUMNS directo a JSON, en el mismo
+    formato y orden de campos que el schema Tenant, sin instanciar modelos
+    Pydantic (las filas vienen de la base y ya son válidas)
+    """
+    content = [
+        {
+            "name": name,
+            "rut": formatear_rut(rut_numero, rut_dv),
+            "is_active": is_active,
+            "id": id,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+        for id, name, rut_numero, rut_dv, is_active, created_at, updated_at in rows
+    ]
+    return FastJSONResponse(content, headers=dict(response.headers))
+
+def _tenant_etag(tenant: TenantModel) -> str:
+    # Incluye los campos visibles: updated_at puede repetirse dentro del mismo segundo en SQLite
+    return make_etag(
+        "tenant", tenant.id, tenant.created_at, tenant.updated_at,
+        tenant.name, tenant.rut_numero, tenant.rut_dv, tenant.is_active
+    )
+
 @router.get("/", response_model=List[Tenant])
-def read_tenants(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+async def read_tenants(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    sort: str = Query("created_at", pattern="^-?(created_at|name)$"),
+    is_active: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    rut: Optional[str] = None,
+    include_total: bool = False,
     current_user: UserModel = Depends(get_current_superadmin),
 ):
-    tenants = db.query(TenantModel).offset(skip).limit(limit).all()
+    """
+    Lista tenants con paginación por cursor sobre (created_at, id) o (name, id).
+    El cursor de la página siguiente se devuelve en el header X-Next-Cursor
+    y, si se pide include_total, el total (aproximado) en X-Total-Count.
+    """
+    descending = sort.startswith("-")
+    sort_column = SORT_COLUMNS[sort.lstrip("-")]
+
+    query = select(TenantModel)
+    filtered = False
+    if is_active is not None:
+        query = query.where(TenantModel.is_active == is_active)
+        filtered = True
+    if name_prefix:
+        query = query.where(func.lower(TenantModel.name).startswith(name_prefix.lower(), autoescape=True))
+        filtered = True
+    if rut:
+        normalizado = normalizar_rut(rut)
+        if normalizado is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="RUT inválido",
+            )
+        query = query.where(TenantModel.rut_numero == normalizado[0])
+        filtered = True
+
+    # GET condicional: cualquier cambio en tenants invalida todos los listados
+    # La versión avanza en la misma transacción que cada alta, cambio o baja de tenants
+    version, last_modified = await get_collection_version(db, "tenants")
+    etag = make_etag("tenants", version, str(request.url.query))
+    if etag_matches(request, etag):
+        return not_modified(etag, last_modified)
+    set_cache_headers(response, etag, last_modified)
+
+    if include_total:
+        response.headers["X-Total-Count"] = str(await _approximate_total(db, query, filtered))
+
+    if cursor:
+        last_value, last_id = decode_cursor(
+            cursor, (datetime if sort_column is TenantModel.created_at else str, int)
+        )
+        if isinstance(last_value, datetime) and db.bind.dialect.name == "sqlite":
+            # SQLite compara fechas como texto: mismo formato que CURRENT_TIMESTAMP
+            last_value = str(last_value.replace(tzinfo=None))
+        key = tuple_(sort_column, TenantModel.id)
+        query = query.where(key < tuple_(last_value, last_id) if descending else key > tuple_(last_value, last_id))
+    elif skip:
+        query = query.offset(skip)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), TenantModel.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), TenantModel.id.asc())
+
+    if settings.FAST_LIST_SERIALIZATION:
+        result = await db.execute(query.with_only_columns(*TENANT_LIST_COLUMNS).limit(limit))
+        tenants = result.all()
+    else:
+        result = await db.execute(query.limit(limit))
+        tenants = result.scalars().all()
+
+    if len(tenants) == limit:
+        last = tenants[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([getattr(last, sort_column.key), last.id])
+    if settings.FAST_LIST_SERIALIZATION:
+        return _fast_tenant_list(tenants, response)
     return tenants
 
+def _rut_prefix_ranges(prefix: str) -> List[tuple]:
+    """
+    Rangos [desde, hasta] de cuerpos de RUT cuya representación decimal
+    comienza con prefix: uno por cada largo posible (hasta 9 dígitos)
+    """
+    base = int(prefix)
+    ranges = []
+    for extra_digits in range(0, 10 - len(prefix)):
+        factor = 10 ** extra_digits
+        ranges.append((base * factor, (base + 1) * factor - 1))
+    return ranges
+
+@router.get("/by-rut/{rut}", response_model=Tenant)
+async def read_tenant_by_rut(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    rut: str,
+    current_user: UserModel = Depends(get_current_superadmin),
+):
+    normalizado = normalizar_rut(rut)
+    if normalizado is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="RUT inválido",
+        )
+    result = await db.execute(select(TenantModel).where(TenantModel.rut_numero == normalizado[0]))
+    tenant = result.scalars().first()
+    if not tenant:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tenant no encontrado",
+        )
+    return tenant
+
+@router.get("/search/rut", response_model=List[Tenant])
+async def search_tenants_by_rut_prefix(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    prefix: str = Query(..., min_length=1, max_length=12),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserModel = Depends(get_current_superadmin),
+):
+    """
+    Busca tenants cuyo RUT comienza con prefix (solo el cuerpo numérico;
+    se ignoran puntos y guión), usando rangos sobre el índice de rut_numero
+    """
+    digits = prefix.replace(".", "").replace("-", "").strip().lstrip("0")
+    if not digits.isdigit() or len(digits) > 9:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Prefijo de RUT inválido",
+        )
+    conditions = [
+        TenantModel.rut_numero.between(low, high)
+        for low, high in _rut_prefix_ranges(digits)
+    ]
+    if settings.FAST_LIST_SERIALIZATION:
+        result = await db.execute(
+            select(*TENANT_LIST_COLUMNS)
+            .where(or_(*conditions))
+            .order_by(TenantModel.rut_numero)
+            .limit(limit)
+        )
+        return _fast_tenant_list(result.all(), response)
+
+    result = await db.execute(
+        select(TenantModel)
+        .where(or_(*conditions))
+        .order_by(TenantModel.rut_numero)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
 @router.get("/{tenant_id}", response_model=Tenant)
-def read_tenant(
+async def read_tenant(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     tenant_id: int,
     current_user: UserModel = Depends(get_current_superadmin),
 ):
-    tenant = db.query(TenantModel).filter(TenantModel.id == tenant_id).first()
+    tenant = await db.get(TenantModel, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant no encontrado",
         )
+    etag = _tenant_etag(tenant)
+    last_modified = tenant.updated_at or tenant.created_at
+    if etag_matches(request, etag):
+        return not_modified(etag, last_modified)
+    set_cache_headers(response, etag, last_modified)
     return tenant
 
+@router.get("/{tenant_id}/coverage")
+async def read_tenant_coverage(
+    tenant_id: int,
+    start: date,
+    end: date,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    PPC diario del tenant sobre sus instalaciones activas
+    """
+    check_range(start, end)
+    ensure_tenant_access(current_user, tenant_id)
+    return FastJSONResponse(await tenant_uncovered(db, tenant_id, start, end))
+
 @router.put("/{tenant_id}", response_model=Tenant)
-def update_tenant(
+async def update_tenant(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     tenant_id: int,
     tenant_in: TenantUpdate,
     current_user: UserModel = Depends(get_current_superadmin),
 ):
-    tenant = db.query(TenantModel).filter(TenantModel.id == tenant_id).first()
+    tenant = await db.get(TenantModel, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,29 +341,29 @@ def update_tenant(
             setattr(tenant, field, value)
         
         db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+        await db.commit()
+        await db.refresh(tenant)
         return tenant
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ya existe un tenant con este RUT",
         )
 
 @router.delete("/{tenant_id}")
-def delete_tenant(
+async def delete_tenant(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     tenant_id: int,
     current_user: UserModel = Depends(get_current_superadmin),
 ):
-    tenant = db.query(TenantModel).filter(TenantModel.id == tenant_id).first()
+    tenant = await db.get(TenantModel, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant no encontrado",
         )
-    db.delete(tenant)
-    db.commit()
-    return {"ok": True} 
\ No newline at end of file
+    await db.delete(tenant)
+    await db.commit()
+    return {"ok": True}
\ No newline at end of file
@@ -0,0 +1,33 @@
+from typing import List, Literal, Optional
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+from pydantic import BaseModel, Field, validator
+
+# Tolerancia al reloj del dispositivo
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+class AttendanceMarkIn(BaseModel):
+    client_mark_id: UUID
+    guard_id: int
+    installation_id: int
+    mark_type: Literal["entrada", "salida"]
+    method: Literal["face_id", "qr", "gps", "manual"]
+    marked_at: datetime
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+    @validator('marked_at')
+    def validate_marked_at(cls, v):
+        if v.tzinfo is None:
+            v = v.replace(tzinfo=timezone.utc)
+        if v > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+            raise ValueError('La marcación no puede estar en el futuro')
+        return v
+
+class AttendanceBatchIn(BaseModel):
+    marks: List[AttendanceMarkIn] = Field(..., min_length=1, max_length=500)
+
+class AttendanceMarkResult(BaseModel):
+    client_mark_id: UUID
+    status: Literal["created", "duplicate", "rejected"]
+    detail: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,34 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, validator
+
+from app.schemas.tenant import _normalizar_o_error
+
+class GuardBase(BaseModel):
+    nombre: str
+    apellido: str
+    rut: str
+    installation_id: Optional[int] = None
+    is_active: bool = True
+
+    @validator('rut')
+    def validate_rut(cls, v):
+        return _normalizar_o_error(v)
+
+class GuardCreate(GuardBase):
+    tenant_id: int
+
+class GuardUpdate(BaseModel):
+    nombre: Optional[str] = None
+    apellido: Optional[str] = None
+    installation_id: Optional[int] = None
+    is_active: Optional[bool] = None
+
+class Guard(GuardBase):
+    id: int
+    tenant_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
@@ -0,0 +1,27 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+class InstallationBase(BaseModel):
+    name: str
+    address: Optional[str] = None
+    required_guards: int = Field(1, ge=0)
+    is_active: bool = True
+
+class InstallationCreate(InstallationBase):
+    tenant_id: int
+
+class InstallationUpdate(BaseModel):
+    name: Optional[str] = None
+    address: Optional[str] = None
+    required_guards: Optional[int] = Field(None, ge=0)
+    is_active: Optional[bool] = None
+
+class Installation(InstallationBase):
+    id: int
+    tenant_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
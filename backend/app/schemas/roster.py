@@ -0,0 +1,57 @@
+from typing import List, Literal, Optional, Union
+from datetime import date
+from pydantic import BaseModel, Field, validator
+
+from app.models.shift import ShiftType
+
+# Nombres de turno expuestos en la API (None limpia la celda)
+SHIFT_TYPE_NAMES = {shift_type.name.lower(): shift_type for shift_type in ShiftType if shift_type}
+
+def _shift_code(value: Optional[str]) -> int:
+    if value is None:
+        return ShiftType.SIN_ASIGNAR
+    try:
+        return SHIFT_TYPE_NAMES[value.lower()]
+    except KeyError:
+        raise ValueError(f"Tipo de turno inválido: {value} ({', '.join(SHIFT_TYPE_NAMES)})")
+
+class RosterAssign(BaseModel):
+    """
+    Asigna el mismo turno a varios guardias en un rango de días (inclusive)
+    """
+    op: Literal["assign"]
+    guard_ids: List[int] = Field(..., min_length=1)
+    start: date
+    end: date
+    shift_type: Optional[str]
+
+    @validator('shift_type')
+    def validate_shift_type(cls, v):
+        _shift_code(v)
+        return v
+
+    @validator('end')
+    def validate_range(cls, v, values):
+        if 'start' in values and v < values['start']:
+            raise ValueError('end debe ser posterior o igual a start')
+        return v
+
+class RosterPattern(BaseModel):
+    """
+    Rellena un ciclo de trabajo/descanso (4x4, 5x2, 7x7) desde start hasta el
+    fin del mes. Con stagger, cada guardia parte desfasado un día del anterior
+    """
+    op: Literal["pattern"]
+    guard_ids: List[int] = Field(..., min_length=1)
+    pattern: Literal["4x4", "5x2", "7x7"]
+    start: date
+    shift_type: str = "dia"
+    stagger: bool = False
+
+    @validator('shift_type')
+    def validate_shift_type(cls, v):
+        _shift_code(v)
+        return v
+
+class RosterEdit(BaseModel):
+    operations: List[Union[RosterAssign, RosterPattern]] = Field(..., min_length=1)
\ No newline at end of file
@@ -0,0 +1,44 @@
+from typing import List, Literal, Optional
+from datetime import datetime, timezone
+from uuid import UUID
+from pydantic import BaseModel, Field, validator
+
+from app.schemas.attendance import MAX_CLOCK_SKEW
+
+class RoundEventIn(BaseModel):
+    event_id: UUID
+    installation_id: int
+    guard_id: int
+    event_type: Literal["gps", "qr"]
+    recorded_at: datetime
+    checkpoint: Optional[str] = Field(None, min_length=1, max_length=64)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    accuracy: Optional[float] = Field(None, ge=0)
+
+    @validator('recorded_at')
+    def validate_recorded_at(cls, v):
+        # Siempre en UTC: define la partición y se compara como texto en SQLite
+        v = v.replace(tzinfo=timezone.utc) if v.tzinfo is None else v.astimezone(timezone.utc)
+        if v > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+            raise ValueError('El evento no puede estar en el futuro')
+        return v
+
+    @validator('checkpoint', always=True)
+    def validate_checkpoint(cls, v, values):
+        if values.get('event_type') == 'qr' and not v:
+            raise ValueError('Los eventos QR requieren checkpoint')
+        return v
+
+    @validator('longitude', always=True)
+    def validate_position(cls, v, values):
+        if values.get('event_type') == 'gps' and (v is None or values.get('latitude') is None):
+            raise ValueError('Los eventos GPS requieren latitude y longitude')
+        return v
+
+class RoundEventBatchIn(BaseModel):
+    events: List[RoundEventIn] = Field(..., min_length=1, max_length=1000)
+
+class RoundAppendResult(BaseModel):
+    created: int
+    duplicate: int
\ No newline at end of file
@@ -1,28 +1,56 @@
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 from datetime import datetime
 from pydantic import BaseModel, validator
 import re
 
-def validar_rut(rut: str) -> bool:
-    """Valida el formato y dígito verificador de un RUT chileno."""
-    rut = rut.upper().replace(".", "").replace("-", "")
-    if not re.match(r'^[0-9]+[0-9Kk]$', rut):
-        return False
-    
-    cuerpo = rut[:-1]
-    dv = rut[-1]
-    
+_RUT_LIMPIEZA = str.maketrans("", "", ".- ")
+_RUT_PATRON = re.compile(r'^([0-9]{1,9})([0-9K])$')
+
+def calcular_dv(cuerpo: int) -> str:
+    """Calcula el dígito verificador (módulo 11) del cuerpo numérico de un RUT."""
     suma = 0
     multiplicador = 2
-    
-    for c in reversed(cuerpo):
-        suma += int(c) * multiplicador
+    while cuerpo:
+        cuerpo, digito = divmod(cuerpo, 10)
+        suma += digito * multiplicador
         multiplicador = multiplicador + 1 if multiplicador < 7 else 2
-    
+
     resto = suma % 11
-    dv_calculado = str(11 - resto) if resto > 1 else 'K'
-    
-    return dv.upper() == dv_calculado
+    dv = 11 - resto
+    if dv == 11:
+        return '0'
+    if dv == 10:
+        return 'K'
+    return str(dv)
+
+def normalizar_rut(rut: str) -> Optional[Tuple[int, str]]:
+    """Normaliza un RUT a (cuerpo, dv); devuelve None si es inválido."""
+    match = _RUT_PATRON.match(rut.upper().translate(_RUT_LIMPIEZA))
+    if not match:
+        return None
+    cuerpo = int(match.group(1))
+    dv = match.group(2)
+    if cuerpo == 0 or calcular_dv(cuerpo) != dv:
+        return None
+    return cuerpo, dv
+
+def normalizar_ruts(ruts: Iterable[str]) -> List[Optional[Tuple[int, str]]]:
+    """Versión por lotes de normalizar_rut, para importaciones masivas."""
+    return [normalizar_rut(rut) for rut in ruts]
+
+def formatear_rut(cuerpo: int, dv: str) -> str:
+    """Formato normalizado de almacenamiento/salida: cuerpo + dv, sin puntos ni guión."""
+    return f"{cuerpo}{dv}"
+
+def validar_rut(rut: str) -> bool:
+    """Valida el formato y dígito verificador de un RUT chileno."""
+    return normalizar_rut(rut) is not None
+
+def _normalizar_o_error(v: str) -> str:
+    normalizado = normalizar_rut(v)
+    if normalizado is None:
+        raise ValueError('RUT inválido')
+    return formatear_rut(*normalizado)
 
 class TenantBase(BaseModel):
     name: str
@@ -31,10 +59,7 @@ class TenantBase(BaseModel):
 
     @validator('rut')
     def validate_rut(cls, v):
-        v = v.upper().replace(".", "").replace("-", "")
-        if not validar_rut(v):
-            raise ValueError('RUT inválido')
-        return v
+        return _normalizar_o_error(v)
 
 class TenantCreate(TenantBase):
     pass
@@ -47,9 +72,7 @@ class TenantUpdate(BaseModel):
     @validator('rut')
     def validate_rut(cls, v):
         if v is not None:
-            v = v.upper().replace(".", "").replace("-", "")
-            if not validar_rut(v):
-                raise ValueError('RUT inválido')
+            v = _normalizar_o_error(v)
         return v
 
 class TenantInDBBase(TenantBase):
@@ -0,0 +1,194 @@
+"""
+Ingesta de marcaciones con group commit.
+
+Los requests encolan sus marcaciones y esperan un future; los writers toman
+de la cola hasta ATTENDANCE_BATCH_SIZE marcaciones o hasta que pasen
+ATTENDANCE_FLUSH_MS desde la primera, validan el lote con una query,
+lo insertan en una sentencia multi-fila y hacen un único commit. El future
+se resuelve después del commit: la respuesta al cliente confirma que la
+marcación quedó persistida.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.config import settings
+from app.core.metrics import attendance_ack_latency, attendance_batch_size, attendance_commit_duration
+from app.db.session import AsyncSessionLocal
+from app.models.attendance import AttendanceMark, MarkType
+from app.models.guard import Guard
+from app.models.installation import Installation
+from app.models.user import User
+from app.schemas.attendance import AttendanceMarkIn
+
+logger = logging.getLogger(__name__)
+
+# (fila a insertar, tenant permitido o None para superadmin, future del request)
+_Pending = Tuple[Dict[str, Any], Optional[int], asyncio.Future]
+
+
+class AttendanceOverloadedError(Exception):
+    """
+    Se lanza cuando la cola de marcaciones está llena
+    """
+
+
+class MarkWriter:
+    def __init__(self, batch_size: int, flush_ms: int, max_queue: int, writers: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000
+        self.max_queue = max_queue
+        self.writers = writers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"batches": 0, "created": 0, "duplicate": 0, "rejected": 0, "overloaded": 0}
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.writers)]
+
+    async def stop(self) -> None:
+        """
+        Espera a que se escriba lo encolado y detiene los writers
+        """
+        if self._queue is None:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def submit(self, marks: List[AttendanceMarkIn], user: User) -> List[Dict[str, Any]]:
+        """
+        Encola las marcaciones y espera su resultado (después del commit)
+        """
+        if self._queue is None:
+            raise RuntimeError("MarkWriter no iniciado")
+        if self._queue.qsize() + len(marks) > self.max_queue:
+            self._stats["overloaded"] += 1
+            raise AttendanceOverloadedError()
+
+        loop = asyncio.get_running_loop()
+        enqueued_at = time.perf_counter()
+        allowed_tenant = None if user.is_superadmin else user.tenant_id
+        futures = []
+        for mark in marks:
+            future = loop.create_future()
+            row = {
+                "client_mark_id": str(mark.client_mark_id),
+                "guard_id": mark.guard_id,
+                "installation_id": mark.installation_id,
+                "mark_type": MarkType[mark.mark_type.upper()].value,
+                "method": mark.method,
+                "marked_at": mark.marked_at,
+                "latitude": mark.latitude,
+                "longitude": mark.longitude,
+                "submitted_by": user.id,
+            }
+            self._queue.put_nowait((row, allowed_tenant, future))
+            futures.append(future)
+        results = list(await asyncio.gather(*futures))
+        attendance_ack_latency.observe(time.perf_counter() - enqueued_at)
+        return results
+
+    async def _next_batch(self) -> List[_Pending]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.exception(f"Error escribiendo lote de {len(batch)} marcaciones")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            # Validación del lote completo en una query por tabla
+            guard_ids = {row["guard_id"] for row, _, _ in batch}
+            installation_ids = {row["installation_id"] for row, _, _ in batch}
+            guards = dict((await db.execute(
+                select(Guard.id, Guard.tenant_id).where(Guard.id.in_(guard_ids), Guard.is_active.is_(True))
+            )).all())
+            installations = dict((await db.execute(
+                select(Installation.id, Installation.tenant_id).where(Installation.id.in_(installation_ids))
+            )).all())
+
+            results: Dict[int, Dict[str, Any]] = {}
+            valid = []
+            for i, (row, allowed_tenant, _) in enumerate(batch):
+                tenant_id = guards.get(row["guard_id"])
+                detail = None
+                if tenant_id is None:
+                    detail = "Guardia no encontrado o inactivo"
+                elif allowed_tenant is not None and tenant_id != allowed_tenant:
+                    detail = "El guardia no pertenece a su tenant"
+                elif installations.get(row["installation_id"]) != tenant_id:
+                    detail = "La instalación no pertenece al tenant del guardia"
+                if detail:
+                    results[i] = {"client_mark_id": row["client_mark_id"], "status": "rejected", "detail": detail}
+                else:
+                    valid.append((i, {**row, "tenant_id": tenant_id}))
+
+            inserted = set()
+            if valid:
+                insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+                statement = (
+                    insert(AttendanceMark)
+                    .values([row for _, row in valid])
+                    .on_conflict_do_nothing(index_elements=["client_mark_id"])
+                    .returning(AttendanceMark.client_mark_id)
+                )
+                inserted = set((await db.execute(statement)).scalars().all())
+                await db.commit()
+
+            seen = set()
+            for i, row in valid:
+                client_mark_id = row["client_mark_id"]
+                created = client_mark_id in inserted and client_mark_id not in seen
+                seen.add(client_mark_id)
+                results[i] = {"client_mark_id": client_mark_id, "status": "created" if created else "duplicate"}
+
+        for i, (_, _, future) in enumerate(batch):
+            self._stats[results[i]["status"]] += 1
+            if not future.done():
+                future.set_result(results[i])
+        self._stats["batches"] += 1
+        attendance_batch_size.observe(len(batch))
+        attendance_commit_duration.observe(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+mark_writer = MarkWriter(
+    settings.ATTENDANCE_BATCH_SIZE,
+    settings.ATTENDANCE_FLUSH_MS,
+    settings.ATTENDANCE_MAX_QUEUE,
+    settings.ATTENDANCE_WRITERS,
+)
\ No newline at end of file
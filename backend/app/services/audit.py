@@ -0,0 +1,382 @@
+"""
+Auditoría de cambios en tenants y usuarios.
+
+Los cambios se capturan en after_flush (quién, qué, antes y después de las
+columnas modificadas) y solo se entregan al writer cuando la transacción
+hace commit, así que el request no espera ningún INSERT de auditoría. El
+writer los inserta en lotes; si la base no está disponible los escribe en
+un spool local acotado (AUDIT_SPOOL_DIR, un archivo por proceso) que se
+reintenta en los ciclos siguientes. Los UPDATE/DELETE masivos (update(),
+delete()) no pasan por la sesión y no se auditan; los INSERT por sentencia
+se registran con record_insert (un objeto) o record_inserted_rows (las filas
+del RETURNING de un INSERT multi-fila, p.ej. la importación de tenants).
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import date, datetime, timezone
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import event, inspect, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.audit_log import AuditLog
+from app.models.tenant import Tenant
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Usuario autenticado del request en curso (lo fija get_current_user)
+audit_actor: ContextVar[Optional[int]] = ContextVar("audit_actor", default=None)
+
+# Entidades auditadas: nombre y columna con el tenant de cada instancia
+AUDITED: Dict[type, Tuple[str, str]] = {
+    Tenant: ("tenant", "id"),
+    User: ("user", "tenant_id"),
+}
+# Columnas cuyo valor no se guarda: solo queda registro de que cambiaron
+REDACTED = {"hashed_password"}
+
+AuditEntry = Dict[str, Any]
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _snapshot(obj: Any) -> Dict[str, Any]:
+    # Solo atributos ya cargados: no dispara queries dentro del flush
+    loaded = inspect(obj).dict
+    return {
+        column.key: "***" if column.key in REDACTED else _json_value(loaded[column.key])
+        for column in obj.__table__.columns if column.key in loaded
+    }
+
+
+def _diff(obj: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    state = inspect(obj)
+    before, after = {}, {}
+    for column in obj.__table__.columns:
+        history = state.attrs[column.key].history
+        if not history.has_changes():
+            continue
+        if column.key in REDACTED:
+            before[column.key] = after[column.key] = "***"
+            continue
+        before[column.key] = _json_value(history.deleted[0]) if history.deleted else None
+        after[column.key] = _json_value(history.added[0]) if history.added else None
+    return before, after
+
+
+def _entry(obj: Any, action: str, before: Dict[str, Any], after: Dict[str, Any]) -> AuditEntry:
+    entity, tenant_key = AUDITED[type(obj)]
+    state = inspect(obj)
+    # Si el cambio saca la entidad del tenant (p.ej. al eliminarlo), queda en el tenant anterior
+    tenant_id = state.dict.get(tenant_key)
+    if tenant_id is None:
+        tenant_id = before.get(tenant_key)
+    return {
+        "entry_id": str(uuid.uuid4()),
+        "occurred_at": datetime.now(timezone.utc),
+        "tenant_id": tenant_id,
+        "actor_id": audit_actor.get(),
+        "action": action,
+        "entity": entity,
+        "entity_id": state.dict.get(state.mapper.primary_key[0].key),
+        "changes": {"before": before, "after": after},
+    }
+
+
+def record_insert(session: Any, obj: Any) -> None:
+    """
+    Registra la creación de obj cuando se insertó con una sentencia
+    (INSERT ... RETURNING) en vez de pasar por el flush
+    """
+    session.info.setdefault("audit_entries", []).append(_entry(obj, "create", {}, _snapshot(obj)))
+
+
+def record_inserted_rows(session: Any, model: type, rows: Iterable[Mapping[str, Any]]) -> None:
+    """
+    Registra una creación por fila de un INSERT multi-fila; rows son las
+    filas completas del RETURNING
+    """
+    entity, tenant_key = AUDITED[model]
+    primary_key = model.__mapper__.primary_key[0].key
+    actor_id = audit_actor.get()
+    occurred_at = datetime.now(timezone.utc)
+    session.info.setdefault("audit_entries", []).extend(
+        {
+            "entry_id": str(uuid.uuid4()),
+            "occurred_at": occurred_at,
+            "tenant_id": row[tenant_key],
+            "actor_id": actor_id,
+            "action": "create",
+            "entity": entity,
+            "entity_id": row[primary_key],
+            "changes": {
+                "before": {},
+                "after": {key: "***" if key in REDACTED else _json_value(value) for key, value in row.items()},
+            },
+        }
+        for row in rows
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    entries = []
+    for obj in session.new:
+        if type(obj) in AUDITED:
+            entries.append(_entry(obj, "create", {}, _snapshot(obj)))
+    for obj in session.dirty:
+        if type(obj) in AUDITED and session.is_modified(obj, include_collections=False):
+            before, after = _diff(obj)
+            if after:
+                entries.append(_entry(obj, "update", before, after))
+    for obj in session.deleted:
+        if type(obj) in AUDITED:
+            entries.append(_entry(obj, "delete", _snapshot(obj), {}))
+    if entries:
+        session.info.setdefault("audit_entries", []).extend(entries)
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_after_commit(session):
+    entries = session.info.pop("audit_entries", None)
+    if entries:
+        audit_writer.enqueue(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("audit_entries", None)
+
+
+class AuditWriter:
+    def __init__(self, batch_size: int, flush_ms: int, max_buffer: int, spool_dir: str, spool_max_bytes: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000
+        self.max_buffer = max_buffer
+        self.spool_dir = spool_dir
+        self.spool_max_bytes = spool_max_bytes
+        self._buffer: Deque[AuditEntry] = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"written": 0, "spooled": 0, "dropped": 0}
+
+    @property
+    def _spool_path(self) -> str:
+        return os.path.join(self.spool_dir, f"audit-{os.getpid()}.jsonl")
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Escribe lo pendiente (o lo deja en el spool) y detiene el writer
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        self._loop = None
+
+    def enqueue(self, entries: List[AuditEntry]) -> None:
+        """
+        Puede llamarse desde cualquier hilo. Sin writer activo (CLIs) o con el
+        buffer lleno, las entradas van directo al spool
+        """
+        if self._loop is None or len(self._buffer) + len(entries) > self.max_buffer:
+            self._spool(entries)
+            return
+        self._buffer.extend(entries)
+        if len(self._buffer) >= self.batch_size:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Error escribiendo auditoría")
+
+    async def flush(self) -> None:
+        entries = [self._buffer.popleft() for _ in range(len(self._buffer))]
+        if self._spool_files():
+            # Hay un corte en curso o pendiente de recuperar: se respeta el orden
+            self._spool(entries)
+            entries = []
+            if not await self._replay():
+                return
+        for start in range(0, len(entries), self.batch_size):
+            try:
+                await self._insert(entries[start:start + self.batch_size])
+            except asyncio.CancelledError:
+                self._spool(entries[start:])
+                raise
+            except Exception as e:
+                logger.warning(f"Base no disponible para auditoría, se usa el spool: {e}")
+                self._spool(entries[start:])
+                return
+
+    async def _insert(self, entries: List[AuditEntry]) -> None:
+        if not entries:
+            return
+        async with AsyncSessionLocal() as db:
+            insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+            await db.execute(
+                insert(AuditLog).values(entries).on_conflict_do_nothing(index_elements=["entry_id"])
+            )
+            await db.commit()
+        self._stats["written"] += len(entries)
+
+    def _spool(self, entries: List[AuditEntry]) -> None:
+        if not entries:
+            return
+        data = "".join(json.dumps(entry, default=_json_value) + "\n" for entry in entries).encode()
+        if self.spool_bytes() + len(data) > self.spool_max_bytes:
+            self._stats["dropped"] += len(entries)
+            logger.error(f"Spool de auditoría lleno, se descartan {len(entries)} entradas")
+            return
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with open(self._spool_path, "ab") as f:
+            f.write(data)
+        self._stats["spooled"] += len(entries)
+
+    def _spool_files(self) -> List[str]:
+        """
+        Archivos del spool de este proceso y de procesos que ya no existen
+        """
+        try:
+            filenames = sorted(os.listdir(self.spool_dir))
+        except FileNotFoundError:
+            return []
+        paths = []
+        for filename in filenames:
+            try:
+                pid = int(filename.split("-", 1)[1].split(".", 1)[0])
+            except (IndexError, ValueError):
+                continue
+            if pid != os.getpid():
+                try:
+                    os.kill(pid, 0)
+                    continue
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    continue
+            paths.append(os.path.join(self.spool_dir, filename))
+        return paths
+
+    async def _replay(self) -> bool:
+        """
+        Inserta el contenido del spool; True si quedó vacío. Cada archivo se
+        renombra antes de leerlo para que las entradas nuevas vayan a otro
+        """
+        for path in self._spool_files():
+            if path.endswith(".replay") and os.path.basename(path).startswith(f"audit-{os.getpid()}."):
+                replay_path = path
+            else:
+                replay_path = os.path.join(self.spool_dir, f"audit-{os.getpid()}.{uuid.uuid4().hex[:8]}.replay")
+                try:
+                    os.replace(path, replay_path)
+                except FileNotFoundError:
+                    # Otro proceso lo tomó primero
+                    continue
+            with open(replay_path, "rb") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            for entry in entries:
+                entry["occurred_at"] = datetime.fromisoformat(entry["occurred_at"])
+            try:
+                for start in range(0, len(entries), self.batch_size):
+                    await self._insert(entries[start:start + self.batch_size])
+            except Exception as e:
+                logger.warning(f"No se pudo recuperar el spool de auditoría: {e}")
+                return False
+            os.remove(replay_path)
+            logger.info(f"Recuperadas {len(entries)} entradas de auditoría del spool")
+        return True
+
+    def spool_bytes(self) -> int:
+        total = 0
+        for path in self._spool_files():
+            try:
+                total += os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "buffered": len(self._buffer), "spool_bytes": self.spool_bytes()}
+
+
+audit_writer = AuditWriter(
+    settings.AUDIT_BATCH_SIZE,
+    settings.AUDIT_FLUSH_MS,
+    settings.AUDIT_MAX_BUFFER,
+    settings.AUDIT_SPOOL_DIR,
+    settings.AUDIT_SPOOL_MAX_BYTES,
+)
+
+
+async def query_audit_log(
+    db: AsyncSession,
+    tenant_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    entity: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 100,
+    before: Optional[Tuple[datetime, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Entradas más recientes primero; before es la clave (occurred_at, id) de
+    la última fila de la página anterior
+    """
+    query = select(AuditLog)
+    if tenant_id is not None:
+        query = query.where(AuditLog.tenant_id == tenant_id)
+    if actor_id is not None:
+        query = query.where(AuditLog.actor_id == actor_id)
+    if entity is not None:
+        query = query.where(AuditLog.entity == entity)
+    if entity_id is not None:
+        query = query.where(AuditLog.entity_id == entity_id)
+    if start is not None:
+        query = query.where(AuditLog.occurred_at >= start)
+    if end is not None:
+        query = query.where(AuditLog.occurred_at < end)
+    if before is not None:
+        query = query.where(tuple_(AuditLog.occurred_at, AuditLog.id) < before)
+    columns = [column for column in AuditLog.__table__.columns if column.key != "entry_id"]
+    result = await db.execute(
+        query.with_only_columns(*columns)
+        .order_by(AuditLog.occurred_at.desc(), AuditLog.id.desc())
+        .limit(limit)
+    )
+    return [row._asdict() for row in result]
\ No newline at end of file
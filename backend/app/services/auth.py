@@ -1,36 +1,47 @@
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.core.auth import TokenManager
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
+from app.services.audit import audit_actor
+from app.services.principal_cache import cache_principal, get_principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    user = await User.get_by_email(db, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
     try:
         payload = TokenManager.verify_token(token, "access")
-        user = db.query(User).filter(User.id == payload.get("sub")).first()
-        
+        user_id = int(payload.get("sub"))
+
+        # Hot path: principal en cache, sin ir a la base de datos
+        user = get_principal(user_id)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            result = await db.execute(select(User).where(User.id == user_id))
+            user = result.scalars().first()
+        
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+
+            cache_principal(user)
             
         if not user.is_active:
             raise HTTPException(
@@ -38,7 +49,9 @@ async def get_current_user(
                 detail="Inactive user",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-            
+
+        # Autor de los cambios que audite este request
+        audit_actor.set(user.id)
         return user
         
     except HTTPException as e:
@@ -58,4 +71,14 @@ async def get_current_superadmin(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
         )
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+def ensure_tenant_access(user: User, tenant_id: int) -> None:
+    """
+    El superadmin accede a todos los tenants; el resto solo al propio
+    """
+    if not user.is_superadmin and user.tenant_id != tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tiene acceso a este tenant"
+        )
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Versiones de listados para ETag/Last-Modified.
+
+Cada escritura de una entidad versionada incrementa su fila en
+collection_versions dentro de la misma transacción: los cambios por la
+sesión se detectan en after_flush y los INSERT por sentencia (importación de
+tenants) llaman a bump_collection_version. Así la versión solo avanza si la
+escritura hace commit y ninguna transacción concurrente puede dejarla atrás.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.collection_version import CollectionVersion
+from app.models.tenant import Tenant
+
+# Entidades versionadas y el listado al que pertenecen
+VERSIONED: Dict[type, str] = {
+    Tenant: "tenants",
+}
+
+
+def _bump_statement(dialect_name: str, name: str) -> Any:
+    insert = pg_insert if dialect_name == "postgresql" else sqlite_insert
+    statement = insert(CollectionVersion).values(name=name, version=1, updated_at=datetime.now(timezone.utc))
+    # El UPDATE toma el lock de la fila: las escrituras concurrentes del listado se ordenan hasta el commit
+    return statement.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": CollectionVersion.version + 1, "updated_at": statement.excluded.updated_at},
+    )
+
+
+async def bump_collection_version(db: AsyncSession, name: str) -> None:
+    """
+    Incrementa la versión de name en la transacción en curso de db
+    """
+    await db.execute(_bump_statement(db.bind.dialect.name, name))
+
+
+async def get_collection_version(db: AsyncSession, name: str) -> Tuple[int, Optional[datetime]]:
+    """
+    (versión, fecha del último cambio) de name; (0, None) si nunca cambió
+    """
+    row = (await db.execute(
+        select(CollectionVersion.version, CollectionVersion.updated_at).where(CollectionVersion.name == name)
+    )).one_or_none()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session, flush_context):
+    names = {VERSIONED[type(obj)] for obj in session.new if type(obj) in VERSIONED}
+    names.update(VERSIONED[type(obj)] for obj in session.deleted if type(obj) in VERSIONED)
+    names.update(
+        VERSIONED[type(obj)]
+        for obj in session.dirty
+        if type(obj) in VERSIONED and session.is_modified(obj, include_collections=False)
+    )
+    if names:
+        connection = session.connection()
+        for name in sorted(names):
+            connection.execute(_bump_statement(connection.dialect.name, name))
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+Índice de cobertura para PPC (puestos por cubrir).
+
+installation_coverage guarda cuántos guardias trabajan por instalación y
+día, y tenant_coverage la suma de min(cubiertos, requeridos) de las
+instalaciones activas del tenant. Ambas se actualizan con deltas al guardar
+la pauta, así el PPC de una instalación o tenant en un día es una lectura
+por clave primaria.
+
+Uso:
+    python -m app.services.coverage check  [--tenant ID]   # compara con un recálculo desde shifts
+    python -m app.services.coverage rebuild [--tenant ID]   # reconstruye el índice desde shifts
+"""
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.coverage import InstallationCoverage, TenantCoverage
+from app.models.installation import Installation
+from app.models.shift import Shift, WORKING_SHIFT_TYPES
+
+logger = logging.getLogger(__name__)
+
+CoverageDeltas = Dict[Tuple[int, date], int]
+MAX_RANGE_DAYS = 366
+
+
+def _insert(db: AsyncSession):
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+async def apply_coverage_deltas(db: AsyncSession, deltas: CoverageDeltas) -> None:
+    """
+    Suma los deltas de guardias en turno por (instalación, día) y ajusta los
+    totales del tenant. No hace commit: corre en la transacción de quien
+    modificó los turnos.
+
+    El upsert suma sobre el valor guardado y devuelve el resultado: el lock
+    de la fila se mantiene hasta el commit, así que guardados concurrentes de
+    la misma instalación y día se aplican uno tras otro (también cuando la
+    fila aún no existe, donde un SELECT FOR UPDATE no bloquearía nada)
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    installation_ids = {installation_id for installation_id, _ in deltas}
+    installations = {
+        row.id: row
+        for row in await db.execute(
+            select(Installation.id, Installation.tenant_id, Installation.required_guards, Installation.is_active)
+            .where(Installation.id.in_(installation_ids))
+        )
+    }
+    installation_rows = [
+        {
+            "installation_id": installation_id,
+            "date": day,
+            "tenant_id": installations[installation_id].tenant_id,
+            "covered": delta,
+        }
+        # Orden fijo: las filas se bloquean en el mismo orden en guardados concurrentes
+        for (installation_id, day), delta in sorted(deltas.items())
+    ]
+
+    upsert = _insert(db)
+    statement = upsert(InstallationCoverage).values(installation_rows)
+    result = await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["installation_id", "date"],
+            set_={"covered": InstallationCoverage.covered + statement.excluded.covered},
+        ).returning(InstallationCoverage.installation_id, InstallationCoverage.date, InstallationCoverage.covered)
+    )
+
+    tenant_deltas: CoverageDeltas = defaultdict(int)
+    for installation_id, day, after in result:
+        delta = deltas[(installation_id, day)]
+        before = after - delta
+        if after < 0:
+            logger.warning(f"Cobertura negativa en instalación {installation_id} {day}: {before} + {delta}")
+        installation = installations[installation_id]
+        if installation.is_active:
+            required = installation.required_guards
+            tenant_deltas[(installation.tenant_id, day)] += (
+                min(max(0, after), required) - min(max(0, before), required)
+            )
+
+    tenant_rows = [
+        {"tenant_id": tenant_id, "date": day, "covered": delta}
+        for (tenant_id, day), delta in sorted(tenant_deltas.items()) if delta
+    ]
+    if tenant_rows:
+        statement = upsert(TenantCoverage).values(tenant_rows)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=["tenant_id", "date"],
+            set_={"covered": TenantCoverage.covered + statement.excluded.covered},
+        ))
+
+
+def check_range(start: date, end: date) -> None:
+    if end < start or (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Rango inválido: end debe ser >= start y cubrir a lo más {MAX_RANGE_DAYS} días",
+        )
+
+
+async def installation_uncovered(
+    db: AsyncSession, installation: Installation, start: date, end: date
+) -> List[Dict]:
+    """
+    PPC por día de una instalación (los días sin fila no tienen cobertura)
+    """
+    result = await db.execute(
+        select(InstallationCoverage.date, InstallationCoverage.covered).where(
+            InstallationCoverage.installation_id == installation.id,
+            InstallationCoverage.date.between(start, end),
+        )
+    )
+    # Un valor negativo indica un índice descuadrado (ver check): se muestra como sin cobertura
+    covered = {day: max(0, value) for day, value in result.all()}
+    required = installation.required_guards if installation.is_active else 0
+    return [
+        {"date": day, "required": required, "covered": covered.get(day, 0),
+         "uncovered": max(0, required - covered.get(day, 0))}
+        for day in _days(start, end)
+    ]
+
+
+async def tenant_uncovered(db: AsyncSession, tenant_id: int, start: date, end: date) -> List[Dict]:
+    """
+    PPC por día de un tenant: requeridos de sus instalaciones activas menos
+    los puestos cubiertos del índice
+    """
+    required = (await db.execute(
+        select(func.coalesce(func.sum(Installation.required_guards), 0)).where(
+            Installation.tenant_id == tenant_id, Installation.is_active.is_(True)
+        )
+    )).scalar_one()
+    result = await db.execute(
+        select(TenantCoverage.date, TenantCoverage.covered).where(
+            TenantCoverage.tenant_id == tenant_id,
+            TenantCoverage.date.between(start, end),
+        )
+    )
+    covered = dict(result.all())
+    return [
+        {"date": day, "required": required, "covered": covered.get(day, 0),
+         "uncovered": max(0, required - covered.get(day, 0))}
+        for day in _days(start, end)
+    ]
+
+
+def _days(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def _recomputed_installation_coverage(tenant_id: Optional[int]):
+    query = (
+        select(Shift.installation_id, Shift.date, Shift.tenant_id, func.count().label("covered"))
+        .where(Shift.shift_type.in_(WORKING_SHIFT_TYPES))
+        .group_by(Shift.installation_id, Shift.date, Shift.tenant_id)
+    )
+    if tenant_id is not None:
+        query = query.where(Shift.tenant_id == tenant_id)
+    return query
+
+
+def _recomputed_tenant_coverage(tenant_id: Optional[int]):
+    effective = case(
+        (InstallationCoverage.covered < Installation.required_guards, InstallationCoverage.covered),
+        else_=Installation.required_guards,
+    )
+    query = (
+        select(InstallationCoverage.tenant_id, InstallationCoverage.date, func.sum(effective).label("covered"))
+        .join(Installation, and_(
+            Installation.id == InstallationCoverage.installation_id, Installation.is_active.is_(True)
+        ))
+        .group_by(InstallationCoverage.tenant_id, InstallationCoverage.date)
+    )
+    if tenant_id is not None:
+        query = query.where(InstallationCoverage.tenant_id == tenant_id)
+    return query
+
+
+async def rebuild_tenant_totals(db: AsyncSession, tenant_id: int) -> None:
+    """
+    Recalcula tenant_coverage desde installation_coverage; se usa cuando
+    cambian los puestos requeridos o el estado de una instalación
+    """
+    await db.execute(delete(TenantCoverage).where(TenantCoverage.tenant_id == tenant_id))
+    await db.execute(
+        insert(TenantCoverage).from_select(["tenant_id", "date", "covered"], _recomputed_tenant_coverage(tenant_id))
+    )
+
+
+async def rebuild(db: AsyncSession, tenant_id: Optional[int] = None) -> None:
+    """
+    Reconstruye el índice completo (o el de un tenant) desde la tabla shifts
+    """
+    scope = [InstallationCoverage.tenant_id == tenant_id] if tenant_id is not None else []
+    await db.execute(delete(InstallationCoverage).where(*scope))
+    await db.execute(
+        insert(InstallationCoverage).from_select(
+            ["installation_id", "date", "tenant_id", "covered"], _recomputed_installation_coverage(tenant_id)
+        )
+    )
+    scope = [TenantCoverage.tenant_id == tenant_id] if tenant_id is not None else []
+    await db.execute(delete(TenantCoverage).where(*scope))
+    await db.execute(
+        insert(TenantCoverage).from_select(["tenant_id", "date", "covered"], _recomputed_tenant_coverage(tenant_id))
+    )
+    await db.commit()
+
+
+async def check(db: AsyncSession, tenant_id: Optional[int] = None) -> List[str]:
+    """
+    Compara el índice con un recálculo desde shifts y devuelve las diferencias
+    """
+    mismatches = []
+
+    expected = {
+        (installation_id, day): covered
+        for installation_id, day, _, covered in await db.execute(_recomputed_installation_coverage(tenant_id))
+    }
+    query = select(InstallationCoverage.installation_id, InstallationCoverage.date, InstallationCoverage.covered)
+    if tenant_id is not None:
+        query = query.where(InstallationCoverage.tenant_id == tenant_id)
+    stored = {(installation_id, day): covered for installation_id, day, covered in await db.execute(query)}
+    for key in sorted(expected.keys() | stored.keys()):
+        if expected.get(key, 0) != stored.get(key, 0):
+            mismatches.append(
+                f"instalación {key[0]} {key[1]}: índice={stored.get(key, 0)} esperado={expected.get(key, 0)}"
+            )
+
+    # Los totales del tenant se recalculan desde los conteos esperados, no desde el índice
+    required = {
+        row.id: row
+        for row in await db.execute(select(Installation.id, Installation.tenant_id, Installation.required_guards, Installation.is_active))
+    }
+    expected_totals: CoverageDeltas = defaultdict(int)
+    for (installation_id, day), covered in expected.items():
+        installation = required[installation_id]
+        if installation.is_active:
+            expected_totals[(installation.tenant_id, day)] += min(covered, installation.required_guards)
+    query = select(TenantCoverage.tenant_id, TenantCoverage.date, TenantCoverage.covered)
+    if tenant_id is not None:
+        query = query.where(TenantCoverage.tenant_id == tenant_id)
+    stored_totals = {(tenant, day): covered for tenant, day, covered in await db.execute(query)}
+    for key in sorted(expected_totals.keys() | stored_totals.keys()):
+        if expected_totals.get(key, 0) != stored_totals.get(key, 0):
+            mismatches.append(
+                f"tenant {key[0]} {key[1]}: índice={stored_totals.get(key, 0)} esperado={expected_totals.get(key, 0)}"
+            )
+    return mismatches
+
+
+async def _run(command: str, tenant_id: Optional[int]) -> int:
+    from app.db import base  # noqa: F401 - registra todos los modelos para las relaciones
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        if command == "rebuild":
+            await rebuild(db, tenant_id)
+            logger.info("Índice de cobertura reconstruido")
+            return 0
+        mismatches = await check(db, tenant_id)
+        for mismatch in mismatches:
+            logger.warning(mismatch)
+        logger.info(f"Diferencias encontradas: {len(mismatches)}")
+        return 1 if mismatches else 0
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Índice de cobertura (PPC)")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--tenant", type=int, help="Limitar a un tenant")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_run(args.command, args.tenant)))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.models.user import User
+
+# hashed_password no se guarda en cache: el principal solo sirve para autorizar
+_CACHED_COLUMNS = [c.key for c in User.__table__.columns if c.key != "hashed_password"]
+_DATETIME_COLUMNS = {"created_at", "updated_at"}
+
+principal_cache = create_cache("principal", settings.PRINCIPAL_CACHE_MAX_SIZE)
+
+
+def _serialize(user: User) -> Dict[str, Any]:
+    data = {}
+    for key in _CACHED_COLUMNS:
+        value = getattr(user, key)
+        data[key] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def _deserialize(data: Dict[str, Any]) -> User:
+    values = {
+        key: datetime.fromisoformat(value) if key in _DATETIME_COLUMNS and value else value
+        for key, value in data.items()
+    }
+    user = User(**values)
+    # Queda como instancia detached con identidad: no se re-inserta si se agrega a una sesión
+    make_transient_to_detached(user)
+    return user
+
+
+def get_principal(user_id: int) -> Optional[User]:
+    data = principal_cache.get(str(user_id))
+    return _deserialize(data) if data is not None else None
+
+
+def cache_principal(user: User) -> None:
+    principal_cache.set(str(user.id), _serialize(user), settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.delete(str(user_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_modified_users(session, flush_context):
+    """
+    Invalida los principals de usuarios actualizados o eliminados en el flush,
+    y vuelve a invalidar tras el commit para que un request concurrente no
+    deje en cache la versión anterior. Los UPDATE masivos (update(User))
+    no pasan por aquí y dependen del TTL.
+    """
+    user_ids = {
+        obj.id for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if user_ids:
+        for user_id in user_ids:
+            invalidate_principal(user_id)
+        session.info.setdefault("modified_user_ids", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("modified_user_ids", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("modified_user_ids", None)
\ No newline at end of file
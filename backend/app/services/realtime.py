@@ -0,0 +1,72 @@
+import logging
+from datetime import date
+from typing import Iterable, List, Tuple
+
+from app.core.pubsub import Message, broker
+from app.models.shift import ShiftType
+from app.services.roster import Roster
+
+logger = logging.getLogger(__name__)
+
+# Sobre este número de celdas se publica un único "roster_changed" en vez de un evento por celda
+MAX_CELL_EVENTS = 200
+
+
+def tenant_channel(tenant_id: int) -> str:
+    return f"tenant:{tenant_id}"
+
+
+def installation_channel(installation_id: int) -> str:
+    return f"installation:{installation_id}"
+
+
+def _roster_changed(installation_id: int, roster: Roster) -> Message:
+    return (
+        f"roster:{installation_id}:{roster.year}-{roster.month}",
+        {
+            "type": "roster_changed",
+            "installation_id": installation_id,
+            "year": roster.year,
+            "month": roster.month,
+        },
+    )
+
+
+async def publish_roster_changes(
+    roster: Roster, cells: List[Tuple[int, date, int]], moved_from: Iterable[int] = ()
+) -> None:
+    """
+    Publica los cambios de pauta ya guardados en los canales de la instalación
+    y del tenant. Las instalaciones de las que se movieron turnos (moved_from)
+    reciben un "roster_changed" para que recarguen su pauta. Un error del
+    broker no afecta al request: el cambio ya está en la base y los clientes
+    se pueden resincronizar por REST
+    """
+    if not cells:
+        return
+    if len(cells) > MAX_CELL_EVENTS:
+        messages: List[Message] = [_roster_changed(roster.installation_id, roster)]
+    else:
+        messages = [
+            (
+                f"shift:{guard_id}:{day.isoformat()}",
+                {
+                    "type": "shift",
+                    "installation_id": roster.installation_id,
+                    "guard_id": guard_id,
+                    "date": day.isoformat(),
+                    "shift_type": ShiftType(code).name.lower(),
+                },
+            )
+            for guard_id, day, code in cells
+        ]
+    moved = {installation_id: [_roster_changed(installation_id, roster)] for installation_id in moved_from}
+    try:
+        await broker.publish(installation_channel(roster.installation_id), messages)
+        for installation_id, source_messages in moved.items():
+            await broker.publish(installation_channel(installation_id), source_messages)
+        await broker.publish(
+            tenant_channel(roster.tenant_id), messages + [message for source in moved.values() for message in source]
+        )
+    except Exception:
+        logger.exception("Error publicando cambios de pauta")
\ No newline at end of file
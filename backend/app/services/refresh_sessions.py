@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import TokenManager
+from app.core.config import settings
+from app.models.refresh_session import RefreshSession
+from app.models.user import User
+from app.services.principal_cache import cache_principal, get_principal
+
+logger = logging.getLogger(__name__)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _add_session(db: AsyncSession, user_id: int, tokens: Dict[str, Any], now: datetime) -> None:
+    db.add(RefreshSession(
+        jti=tokens["refresh_jti"],
+        family_id=tokens["family_id"],
+        user_id=user_id,
+        expires_at=now + timedelta(seconds=tokens["refresh_expires_in"]),
+    ))
+
+
+async def open_session(db: AsyncSession, user: User) -> Dict[str, Any]:
+    """
+    Emite access y refresh token para un login y registra la sesión
+    """
+    tokens = TokenManager.create_tokens(user)
+    _add_session(db, user.id, tokens, datetime.now(timezone.utc))
+    await db.commit()
+    return tokens
+
+
+async def rotate_session(db: AsyncSession, refresh_token: str) -> Dict[str, Any]:
+    """
+    Canjea un refresh token por un par nuevo de la misma familia.
+
+    El canje es un UPDATE condicional sobre la PK: solo un request puede
+    marcar el token como usado. Si el token ya estaba usado se trata como
+    robado y se revoca la familia completa.
+    """
+    payload = TokenManager.verify_token(refresh_token, "refresh")
+    jti, family_id = payload.get("jti"), payload.get("fam")
+    if not jti or not family_id:
+        raise _unauthorized("Refresh token sin sesión, vuelva a iniciar sesión")
+
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(RefreshSession)
+        .where(
+            RefreshSession.jti == jti,
+            RefreshSession.used_at.is_(None),
+            RefreshSession.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshSession.user_id)
+    )
+    user_id = result.scalar_one_or_none()
+
+    if user_id is None:
+        used_at = (await db.execute(
+            select(RefreshSession.used_at).where(RefreshSession.jti == jti)
+        )).scalar_one_or_none()
+        if used_at is not None:
+            revoked = await revoke_family(db, family_id)
+            logger.warning(
+                f"Refresh token reutilizado (familia {family_id}); sesiones revocadas: {revoked}"
+            )
+            raise _unauthorized("Refresh token reutilizado, sesión revocada")
+        await db.rollback()
+        raise _unauthorized("Sesión expirada o revocada")
+
+    user = get_principal(user_id)
+    if user is None:
+        user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+        if user is not None:
+            cache_principal(user)
+    if user is None or not user.is_active:
+        await revoke_family(db, family_id)
+        raise _unauthorized("Inactive user")
+
+    tokens = TokenManager.create_tokens(user, family_id)
+    _add_session(db, user_id, tokens, now)
+    await db.commit()
+    return tokens
+
+
+async def revoke_family(db: AsyncSession, family_id: str) -> int:
+    """
+    Elimina todas las sesiones de una familia (logout o reutilización)
+    """
+    result = await db.execute(delete(RefreshSession).where(RefreshSession.family_id == family_id))
+    await db.commit()
+    return result.rowcount
+
+
+async def purge_expired_sessions(db: AsyncSession) -> int:
+    """
+    Elimina sesiones expiradas en lotes de REFRESH_SESSION_PURGE_BATCH filas,
+    con un commit por lote para no mantener locks largos
+    """
+    batch_size = settings.REFRESH_SESSION_PURGE_BATCH
+    now = datetime.now(timezone.utc)
+    purged = 0
+    while True:
+        expired = (
+            select(RefreshSession.jti)
+            .where(RefreshSession.expires_at <= now)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await db.execute(delete(RefreshSession).where(RefreshSession.jti.in_(expired)))
+        await db.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
\ No newline at end of file
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.revocation import revocation_list
+from app.db.session import AsyncSessionLocal
+from app.models.revoked_token import RevokedToken
+from app.services.refresh_sessions import purge_expired_sessions
+
+logger = logging.getLogger(__name__)
+
+# Margen para no perder revocaciones de transacciones que commitean fuera de orden
+_SYNC_OVERLAP = timedelta(seconds=30)
+_last_sync: Optional[datetime] = None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite devuelve datetimes naive
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def revoke_token(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """
+    Revoca el jti de un token ya verificado, en la base de datos y en el índice local
+    """
+    jti = payload.get("jti")
+    exp = payload.get("exp")
+    if not jti or not exp or revocation_list.is_revoked(jti):
+        return
+
+    db.add(RevokedToken(
+        jti=jti,
+        token_type=payload.get("type", "access"),
+        expires_at=datetime.fromtimestamp(exp, tz=timezone.utc),
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Ya revocado por otro worker
+        await db.rollback()
+    revocation_list.add(jti, exp)
+
+
+async def sync_revocations(db: AsyncSession) -> int:
+    """
+    Carga en el índice local las revocaciones hechas por otros workers desde
+    la última sincronización (o todas las vigentes en la primera llamada)
+    """
+    global _last_sync
+    now = datetime.now(timezone.utc)
+    query = select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at).where(
+        RevokedToken.expires_at > now
+    )
+    if _last_sync is not None:
+        query = query.where(RevokedToken.revoked_at >= _last_sync - _SYNC_OVERLAP)
+
+    result = await db.execute(query)
+    loaded = 0
+    for jti, expires_at, revoked_at in result:
+        revocation_list.add(jti, _as_utc(expires_at).timestamp())
+        revoked_at = _as_utc(revoked_at)
+        if _last_sync is None or revoked_at > _last_sync:
+            _last_sync = revoked_at
+        loaded += 1
+    if _last_sync is None:
+        _last_sync = now
+    revocation_list.prune()
+    return loaded
+
+
+async def purge_expired_revocations(db: AsyncSession) -> int:
+    """
+    Elimina de la tabla las revocaciones de tokens que ya expiraron
+    """
+    result = await db.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def run_revocation_sync() -> None:
+    """
+    Tarea de fondo: sincroniza el índice local y purga revocaciones y
+    sesiones de refresh expiradas
+    """
+    cycles = 0
+    while True:
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+        cycles += 1
+        try:
+            async with AsyncSessionLocal() as db:
+                await sync_revocations(db)
+                # La purga es menos urgente: una vez cada ~100 ciclos
+                if cycles % 100 == 0:
+                    purged = await purge_expired_revocations(db)
+                    if purged:
+                        logger.info(f"Revocaciones expiradas eliminadas: {purged}")
+                    purged = await purge_expired_sessions(db)
+                    if purged:
+                        logger.info(f"Sesiones de refresh expiradas eliminadas: {purged}")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error sincronizando tokens revocados")
\ No newline at end of file
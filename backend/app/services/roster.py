@@ -0,0 +1,273 @@
+"""
+Pauta mensual de una instalación como matriz densa días × guardias.
+
+Cada celda es un código ShiftType (uint8). Las ediciones masivas y los
+patrones se aplican con operaciones vectorizadas sobre la matriz, y al
+guardar solo se escriben las celdas que cambiaron desde la carga, en
+sentencias multi-fila.
+"""
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, false, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.guard import Guard
+from app.models.installation import Installation
+from app.models.shift import Shift, ShiftType, WORKING_SHIFT_TYPES
+from app.services.coverage import CoverageDeltas, apply_coverage_deltas
+
+ROSTER_DTYPE = np.uint8
+# Días de trabajo y de descanso de cada ciclo
+PATTERNS = {"4x4": (4, 4), "5x2": (5, 2), "7x7": (7, 7)}
+# Letra por código para renderizar la fila de cada guardia como un string
+SHIFT_LETTERS = np.frombuffer(b"-DNLVMP", dtype=np.uint8)
+SHIFT_LEGEND = {chr(SHIFT_LETTERS[code]): code.name.lower() for code in ShiftType}
+
+
+class Roster:
+    def __init__(
+        self,
+        installation: Installation,
+        year: int,
+        month: int,
+        guards: List[Dict[str, Any]],
+        matrix: np.ndarray,
+    ):
+        self.installation_id = installation.id
+        self.tenant_id = installation.tenant_id
+        self.year, self.month = year, month
+        self.first_day = date(year, month, 1)
+        self.days = calendar.monthrange(year, month)[1]
+        self.guards = guards
+        self.guard_ids = np.array([guard["id"] for guard in guards], dtype=np.int64)
+        self._columns = {guard["id"]: i for i, guard in enumerate(guards)}
+        self.matrix = matrix
+        self._saved = matrix.copy()
+
+    @classmethod
+    async def load(cls, db: AsyncSession, installation: Installation, year: int, month: int) -> "Roster":
+        """
+        Carga el mes en dos queries: los guardias de la instalación y sus
+        turnos del mes (solo las columnas necesarias, sin instanciar modelos)
+        """
+        first_day = date(year, month, 1)
+        last_day = date(year, month, calendar.monthrange(year, month)[1])
+
+        guard_columns = (Guard.id, Guard.nombre, Guard.apellido)
+        result = await db.execute(
+            select(*guard_columns)
+            .where(Guard.installation_id == installation.id, Guard.is_active.is_(True))
+            .order_by(Guard.apellido, Guard.nombre, Guard.id)
+        )
+        guards = [{"id": id, "nombre": nombre, "apellido": apellido} for id, nombre, apellido in result]
+
+        result = await db.execute(
+            select(Shift.guard_id, Shift.date, Shift.shift_type).where(
+                Shift.installation_id == installation.id,
+                Shift.date.between(first_day, last_day),
+            )
+        )
+        shifts = result.all()
+
+        # Guardias con turnos en la instalación pero con otra base (o inactivos) van al final
+        known = {guard["id"] for guard in guards}
+        missing = {guard_id for guard_id, _, _ in shifts} - known
+        if missing:
+            result = await db.execute(
+                select(*guard_columns).where(Guard.id.in_(missing)).order_by(Guard.apellido, Guard.nombre, Guard.id)
+            )
+            guards.extend({"id": id, "nombre": nombre, "apellido": apellido} for id, nombre, apellido in result)
+
+        roster = cls(installation, year, month, guards, np.zeros((last_day.day, len(guards)), dtype=ROSTER_DTYPE))
+        if shifts:
+            guard_ids, dates, shift_types = zip(*shifts)
+            columns = np.fromiter((roster._columns[guard_id] for guard_id in guard_ids), np.int64, len(shifts))
+            days = np.fromiter((day.day - 1 for day in dates), np.int64, len(shifts))
+            roster.matrix[days, columns] = shift_types
+            roster._saved = roster.matrix.copy()
+        return roster
+
+    def _guard_columns(self, guard_ids: Iterable[int]) -> np.ndarray:
+        guard_ids = list(guard_ids)
+        try:
+            return np.fromiter((self._columns[guard_id] for guard_id in guard_ids), np.int64, len(guard_ids))
+        except KeyError as e:
+            raise ValueError(f"El guardia {e.args[0]} no pertenece a la pauta de esta instalación")
+
+    def _day_index(self, day: date) -> int:
+        return (day - self.first_day).days
+
+    def assign(self, guard_ids: Iterable[int], start: date, end: date, shift_type: int) -> None:
+        """
+        Asigna shift_type a los guardias entre start y end (inclusive, recortado al mes)
+        """
+        columns = self._guard_columns(guard_ids)
+        first = max(0, self._day_index(start))
+        last = min(self.days - 1, self._day_index(end))
+        if first <= last:
+            self.matrix[first:last + 1, columns] = shift_type
+
+    def fill_pattern(
+        self,
+        guard_ids: Iterable[int],
+        pattern: str,
+        start: date,
+        shift_type: int = ShiftType.DIA,
+        stagger: bool = False,
+    ) -> None:
+        """
+        Rellena un ciclo trabajo/descanso desde start hasta fin de mes. Si start
+        es anterior al mes, el ciclo continúa en la fase que le corresponde
+        """
+        work_days, rest_days = PATTERNS[pattern]
+        cycle = np.array([shift_type] * work_days + [ShiftType.LIBRE] * rest_days, dtype=ROSTER_DTYPE)
+        columns = self._guard_columns(guard_ids)
+        first = max(0, self._day_index(start))
+        if first >= self.days:
+            return
+
+        # Fase de cada celda: días transcurridos desde start, menos el desfase del guardia
+        elapsed = np.arange(first, self.days) - self._day_index(start)
+        offsets = np.arange(len(columns)) if stagger else np.zeros(len(columns), dtype=np.int64)
+        phase = (elapsed[:, None] - offsets[None, :]) % len(cycle)
+        self.matrix[first:, columns] = cycle[phase]
+
+    def changes(self) -> int:
+        return int(np.count_nonzero(self.matrix != self._saved))
+
+    def changed_cells(self) -> List[Tuple[int, date, int]]:
+        """
+        (guardia, día, código) de las celdas modificadas y aún no guardadas
+        """
+        days, columns = np.nonzero(self.matrix != self._saved)
+        return [
+            (int(guard_id), self.first_day + timedelta(days=int(day)), int(value))
+            for day, guard_id, value in zip(days, self.guard_ids[columns], self.matrix[days, columns])
+        ]
+
+    async def save(self, db: AsyncSession, batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Persiste solo las celdas modificadas: upserts multi-fila para las
+        asignadas y DELETE por (guardia, día) para las que quedaron vacías,
+        todo en una transacción junto con los deltas del índice de cobertura.
+
+        Los deltas se calculan contra los turnos que hay en la base después
+        de bloquear a los guardias afectados, no contra la carga: dos
+        guardados concurrentes de la misma celda no la cuentan dos veces.
+        moved_from lista las instalaciones de las que se movieron turnos
+        """
+        batch_size = batch_size or settings.ROSTER_SAVE_BATCH
+        days, columns = np.nonzero(self.matrix != self._saved)
+        if not len(days):
+            return {"upserted": 0, "deleted": 0, "moved_from": []}
+
+        values = self.matrix[days, columns]
+        guard_ids = self.guard_ids[columns]
+        dates = [self.first_day + timedelta(days=int(day)) for day in days]
+        cells = [(int(guard_id), day) for guard_id, day in zip(guard_ids, dates)]
+
+        await self._lock_guards(db, {guard_id for guard_id, _ in cells})
+        # (guardia, día) -> (instalación, código) de lo que está guardado ahora
+        current: Dict[Tuple[int, date], Tuple[int, int]] = {}
+        for start in range(0, len(cells), batch_size):
+            result = await db.execute(
+                select(Shift.guard_id, Shift.date, Shift.installation_id, Shift.shift_type).where(
+                    tuple_(Shift.guard_id, Shift.date).in_(cells[start:start + batch_size])
+                )
+            )
+            current.update(((guard_id, day), (installation_id, shift_type))
+                           for guard_id, day, installation_id, shift_type in result)
+
+        rows = []
+        cleared = []
+        moved_from = set()
+        deltas: CoverageDeltas = defaultdict(int)
+        for (guard_id, day), value in zip(cells, values.tolist()):
+            installation_id, previous = current.get((guard_id, day), (None, ShiftType.SIN_ASIGNAR))
+            if value == ShiftType.SIN_ASIGNAR:
+                # El DELETE se limita a esta instalación: un turno en otra no se toca
+                if installation_id != self.installation_id:
+                    continue
+                cleared.append((guard_id, day))
+            else:
+                # Un guardia tiene un turno por día: asignarlo aquí lo mueve a esta instalación
+                rows.append({
+                    "tenant_id": self.tenant_id,
+                    "installation_id": self.installation_id,
+                    "guard_id": guard_id,
+                    "date": day,
+                    "shift_type": value,
+                })
+                if value in WORKING_SHIFT_TYPES:
+                    deltas[(self.installation_id, day)] += 1
+                if installation_id not in (None, self.installation_id):
+                    moved_from.add(installation_id)
+            if previous in WORKING_SHIFT_TYPES:
+                deltas[(installation_id, day)] -= 1
+
+        insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        for start in range(0, len(rows), batch_size):
+            statement = insert(Shift).values(rows[start:start + batch_size])
+            statement = statement.on_conflict_do_update(
+                index_elements=["guard_id", "date"],
+                set_={
+                    "installation_id": statement.excluded.installation_id,
+                    "shift_type": statement.excluded.shift_type,
+                    "updated_at": func.now(),
+                },
+            )
+            await db.execute(statement)
+
+        for start in range(0, len(cleared), batch_size):
+            await db.execute(
+                delete(Shift).where(
+                    Shift.installation_id == self.installation_id,
+                    tuple_(Shift.guard_id, Shift.date).in_(cleared[start:start + batch_size]),
+                )
+            )
+
+        await apply_coverage_deltas(db, deltas)
+        await db.commit()
+        self._saved = self.matrix.copy()
+        return {"upserted": len(rows), "deleted": len(cleared), "moved_from": sorted(moved_from)}
+
+    @staticmethod
+    async def _lock_guards(db: AsyncSession, guard_ids: Iterable[int]) -> None:
+        """
+        Serializa los guardados que tocan a los mismos guardias (en cualquier
+        instalación) hasta el commit
+        """
+        if db.bind.dialect.name == "postgresql":
+            await db.execute(
+                select(Guard.id).where(Guard.id.in_(list(guard_ids))).order_by(Guard.id).with_for_update()
+            )
+        else:
+            # SQLite no tiene FOR UPDATE: una escritura vacía toma el lock de escritura de la base
+            await db.execute(update(Shift).where(false()).values(shift_type=Shift.shift_type))
+
+    def render(self) -> Dict[str, Any]:
+        """
+        Una fila de letras por guardia (ver SHIFT_LEGEND) y la cantidad de
+        guardias trabajando por día
+        """
+        letters = SHIFT_LETTERS[self.matrix.T].tobytes().decode("ascii")
+        coverage = np.isin(self.matrix, WORKING_SHIFT_TYPES).sum(axis=1)
+        return {
+            "installation_id": self.installation_id,
+            "year": self.year,
+            "month": self.month,
+            "days": self.days,
+            "legend": SHIFT_LEGEND,
+            "guards": [
+                {**guard, "shifts": letters[i * self.days:(i + 1) * self.days]}
+                for i, guard in enumerate(self.guards)
+            ],
+            "coverage": coverage.tolist(),
+        }
\ No newline at end of file
@@ -0,0 +1,359 @@
+"""
+Eventos de ronda (GPS y lecturas QR) en una tabla particionada por tiempo.
+
+En PostgreSQL round_events está particionada por rango de recorded_at, con
+una partición por mes o por día (ROUND_PARTITION_INTERVAL) llamada
+round_events_pAAAAMM o round_events_pAAAAMMDD. Las particiones futuras se
+crean por adelantado en la mantención; las que falten para eventos
+atrasados se crean al insertar. La retención elimina particiones completas
+con DROP TABLE en vez de borrar filas. En SQLite es una tabla normal y la
+retención borra por lotes.
+
+Uso:
+    python -m app.services.rounds list
+    python -m app.services.rounds ensure [--ahead N]                   # crea las particiones próximas
+    python -m app.services.rounds prune  [--retention-days N] [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, literal_column, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.guard import Guard
+from app.models.installation import Installation
+from app.models.round_event import RoundEvent, RoundEventType
+from app.models.user import User
+from app.schemas.round_event import RoundEventIn
+from app.services.auth import ensure_tenant_access
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = RoundEvent.__tablename__
+# Filas borradas por sentencia en la retención sin particiones (SQLite)
+PRUNE_BATCH = 10000
+
+EVENT_COLUMNS = (
+    RoundEvent.event_id,
+    RoundEvent.guard_id,
+    RoundEvent.event_type,
+    RoundEvent.recorded_at,
+    RoundEvent.checkpoint,
+    RoundEvent.latitude,
+    RoundEvent.longitude,
+    RoundEvent.accuracy,
+)
+EVENT_TYPE_NAMES = {event_type.value: event_type.name.lower() for event_type in RoundEventType}
+
+
+@dataclass(frozen=True, order=True)
+class Partition:
+    start: datetime
+    end: datetime
+    name: str
+
+
+def partition_for(moment: datetime, interval: Optional[str] = None) -> Partition:
+    """
+    Partición que contiene moment según el intervalo configurado
+    """
+    interval = interval or settings.ROUND_PARTITION_INTERVAL
+    moment = moment.astimezone(timezone.utc)
+    if interval == "day":
+        start = datetime(moment.year, moment.month, moment.day, tzinfo=timezone.utc)
+        return Partition(start, start + timedelta(days=1), f"{PARENT_TABLE}_p{start:%Y%m%d}")
+    start = datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+    end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return Partition(start, end, f"{PARENT_TABLE}_p{start:%Y%m}")
+
+
+def _parse_partition(name: str) -> Optional[Partition]:
+    suffix = name[len(f"{PARENT_TABLE}_p"):]
+    try:
+        if len(suffix) == 8:
+            return partition_for(datetime.strptime(suffix, "%Y%m%d").replace(tzinfo=timezone.utc), "day")
+        if len(suffix) == 6:
+            return partition_for(datetime.strptime(suffix, "%Y%m").replace(tzinfo=timezone.utc), "month")
+    except ValueError:
+        pass
+    return None
+
+
+def _is_partitioned(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "postgresql"
+
+
+# Particiones conocidas por este proceso; se recarga cuando falta alguna
+_known_partitions: List[Partition] = []
+
+
+def _covered(moment: datetime) -> bool:
+    return any(partition.start <= moment < partition.end for partition in _known_partitions)
+
+
+async def list_partitions(db: AsyncSession) -> List[Partition]:
+    if not _is_partitioned(db):
+        return []
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions = sorted(filter(None, map(_parse_partition, result.scalars())))
+    _known_partitions[:] = partitions
+    return partitions
+
+
+async def ensure_partitions(db: AsyncSession, moments: Iterable[datetime]) -> List[str]:
+    """
+    Crea las particiones que faltan para los instantes dados. El DDL corre en
+    una conexión y transacción propias para no retener el lock de la tabla
+    padre durante la transacción de quien inserta; por lo mismo debe
+    llamarse antes de tocar round_events en la sesión
+    """
+    if not _is_partitioned(db):
+        return []
+    moments = [moment for moment in moments if not _covered(moment)]
+    if not moments:
+        return []
+    # Otra instancia pudo haberlas creado
+    await list_partitions(db)
+    missing = sorted({partition_for(moment) for moment in moments if not _covered(moment)})
+    # Una partición de otro intervalo (si se cambió la configuración) no puede solaparse
+    missing = [
+        partition for partition in missing
+        if not any(known.start < partition.end and partition.start < known.end for known in _known_partitions)
+    ]
+    if not missing:
+        return []
+    async with db.bind.begin() as connection:
+        for partition in missing:
+            await connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{partition.start.isoformat()}') TO ('{partition.end.isoformat()}')"
+            ))
+    _known_partitions[:] = sorted(set(_known_partitions) | set(missing))
+    logger.info(f"Particiones creadas: {', '.join(partition.name for partition in missing)}")
+    return [partition.name for partition in missing]
+
+
+async def ensure_upcoming(db: AsyncSession, ahead: Optional[int] = None) -> List[str]:
+    """
+    Crea la partición actual y las ROUND_PARTITIONS_AHEAD siguientes
+    """
+    ahead = settings.ROUND_PARTITIONS_AHEAD if ahead is None else ahead
+    partition = partition_for(datetime.now(timezone.utc))
+    moments = [partition.start]
+    for _ in range(ahead):
+        partition = partition_for(partition.end)
+        moments.append(partition.start)
+    return await ensure_partitions(db, moments)
+
+
+async def prune_expired(
+    db: AsyncSession, retention_days: Optional[int] = None, dry_run: bool = False
+) -> Tuple[List[str], int]:
+    """
+    Elimina los eventos anteriores a la retención: en PostgreSQL las
+    particiones que terminan antes del corte (las que lo cruzan se conservan
+    completas); en SQLite por lotes de filas. Devuelve (particiones, filas)
+    """
+    retention_days = settings.ROUND_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+
+    if _is_partitioned(db):
+        expired = [partition for partition in await list_partitions(db) if partition.end <= cutoff]
+        if expired and not dry_run:
+            async with db.bind.begin() as connection:
+                for partition in expired:
+                    await connection.execute(text(f"DROP TABLE IF EXISTS {partition.name}"))
+            _known_partitions[:] = [partition for partition in _known_partitions if partition not in expired]
+            logger.info(f"Particiones eliminadas: {', '.join(partition.name for partition in expired)}")
+        return [partition.name for partition in expired], 0
+
+    if dry_run:
+        return [], 0
+    deleted = 0
+    rowid = literal_column("rowid")
+    while True:
+        result = await db.execute(
+            delete(RoundEvent).where(
+                rowid.in_(select(rowid).select_from(RoundEvent).where(RoundEvent.recorded_at < cutoff).limit(PRUNE_BATCH))
+            )
+        )
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < PRUNE_BATCH:
+            return [], deleted
+
+
+async def append_events(db: AsyncSession, events: List[RoundEventIn], user: User) -> Dict[str, int]:
+    """
+    Inserta un lote de eventos en una sentencia multi-fila. Los reintentos
+    (mismo event_id, instalación e instante) se ignoran y cuentan como duplicados
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.ROUND_RETENTION_DAYS)
+    if any(event.recorded_at < cutoff for event in events):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Hay eventos anteriores a la retención de {settings.ROUND_RETENTION_DAYS} días",
+        )
+
+    installation_ids = {event.installation_id for event in events}
+    guard_ids = {event.guard_id for event in events}
+    installations = dict((await db.execute(
+        select(Installation.id, Installation.tenant_id).where(Installation.id.in_(installation_ids))
+    )).all())
+    guards = dict((await db.execute(
+        select(Guard.id, Guard.tenant_id).where(Guard.id.in_(guard_ids))
+    )).all())
+    missing = installation_ids - installations.keys()
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Instalaciones no encontradas: {sorted(missing)}",
+        )
+    for tenant_id in set(installations.values()):
+        ensure_tenant_access(user, tenant_id)
+    invalid = sorted({event.guard_id for event in events if guards.get(event.guard_id) != installations[event.installation_id]})
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Guardias que no pertenecen al tenant de la instalación: {invalid}",
+        )
+
+    await ensure_partitions(db, (event.recorded_at for event in events))
+
+    rows = [
+        {
+            "installation_id": event.installation_id,
+            "recorded_at": event.recorded_at,
+            "event_id": str(event.event_id),
+            "tenant_id": installations[event.installation_id],
+            "guard_id": event.guard_id,
+            "event_type": RoundEventType[event.event_type.upper()].value,
+            "checkpoint": event.checkpoint,
+            "latitude": event.latitude,
+            "longitude": event.longitude,
+            "accuracy": event.accuracy,
+        }
+        for event in events
+    ]
+    insert = pg_insert if _is_partitioned(db) else sqlite_insert
+    statement = (
+        insert(RoundEvent)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["installation_id", "recorded_at", "event_id"])
+        .returning(RoundEvent.event_id)
+    )
+    created = len((await db.execute(statement)).all())
+    await db.commit()
+    return {"created": created, "duplicate": len(rows) - created}
+
+
+def check_event_range(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """
+    Normaliza el rango a UTC y lo acota a ROUND_QUERY_MAX_DAYS, para que una
+    consulta toque pocas particiones
+    """
+    start, end = (
+        moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+        for moment in (start, end)
+    )
+    if end <= start or end - start > timedelta(days=settings.ROUND_QUERY_MAX_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Rango inválido: end debe ser > start y cubrir a lo más {settings.ROUND_QUERY_MAX_DAYS} días",
+        )
+    return start, end
+
+
+async def installation_events(
+    db: AsyncSession,
+    installation_id: int,
+    start: datetime,
+    end: datetime,
+    guard_id: Optional[int] = None,
+    limit: int = 500,
+    after: Optional[Tuple[datetime, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Eventos de una instalación en [start, end) ordenados por tiempo. El filtro
+    por recorded_at permite a PostgreSQL descartar las demás particiones y el
+    orden coincide con la clave primaria
+    """
+    query = select(*EVENT_COLUMNS).where(
+        RoundEvent.installation_id == installation_id,
+        RoundEvent.recorded_at >= start,
+        RoundEvent.recorded_at < end,
+    )
+    if guard_id is not None:
+        query = query.where(RoundEvent.guard_id == guard_id)
+    if after is not None:
+        query = query.where(tuple_(RoundEvent.recorded_at, RoundEvent.event_id) > after)
+    result = await db.execute(query.order_by(RoundEvent.recorded_at, RoundEvent.event_id).limit(limit))
+    return [
+        {**row._asdict(), "event_type": EVENT_TYPE_NAMES.get(row.event_type, row.event_type)}
+        for row in result
+    ]
+
+
+async def run_round_maintenance() -> None:
+    """
+    Tarea de fondo: cada hora crea las particiones próximas y aplica la retención
+    """
+    while True:
+        await asyncio.sleep(3600)
+        try:
+            async with AsyncSessionLocal() as db:
+                await ensure_upcoming(db)
+                await prune_expired(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error en la mantención de particiones de rondas")
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.db import base  # noqa: F401 - registra todos los modelos para las relaciones
+
+    async with AsyncSessionLocal() as db:
+        if args.command == "ensure":
+            created = await ensure_upcoming(db, args.ahead)
+            logger.info(f"Particiones creadas: {len(created)}")
+        elif args.command == "prune":
+            partitions, rows = await prune_expired(db, args.retention_days, args.dry_run)
+            action = "a eliminar" if args.dry_run else "eliminadas"
+            logger.info(f"Particiones {action}: {partitions or 'ninguna'}; filas eliminadas: {rows}")
+        else:
+            if not _is_partitioned(db):
+                logger.info("La base no es PostgreSQL: round_events no está particionada")
+            for partition in await list_partitions(db):
+                print(f"{partition.name}  {partition.start.isoformat()} .. {partition.end.isoformat()}")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Particiones de eventos de ronda")
+    parser.add_argument("command", choices=["list", "ensure", "prune"])
+    parser.add_argument("--ahead", type=int, help="Particiones futuras a crear (ROUND_PARTITIONS_AHEAD)")
+    parser.add_argument("--retention-days", type=int, help="Días a conservar (ROUND_RETENTION_DAYS)")
+    parser.add_argument("--dry-run", action="store_true", help="Solo mostrar lo que se eliminaría")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,163 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tenant import Tenant as TenantModel
+from app.schemas.tenant import formatear_rut, normalizar_ruts
+from app.services.audit import record_inserted_rows
+from app.services.collection_versions import bump_collection_version
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+_TRUE_VALUES = {"1", "true", "t", "yes", "si", "sí", "y", "s"}
+_FALSE_VALUES = {"0", "false", "f", "no", "n"}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Convierte un stream de bytes en líneas de texto sin cargar todo el body
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def iter_rows(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[tuple]:
+    """
+    Produce (número de línea, dict) para CSV (con header) o NDJSON.
+    Las filas que no se pueden parsear se entregan con el error como valor.
+    """
+    header: Optional[List[str]] = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            # Un registro por línea: no se soportan campos con saltos de línea
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip().lower() for h in values]
+                continue
+            yield line_number, dict(zip(header, values))
+        else:
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"JSON inválido: {e}"
+                continue
+            yield line_number, row if isinstance(row, dict) else "Se esperaba un objeto JSON"
+
+
+def _parse_bool(value: Any) -> bool:
+    if value is None or value == "":
+        return True
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(f"Valor booleano inválido: {value}")
+
+
+def validate_batch(rows: List[tuple], report: Dict[str, Any]) -> List[tuple]:
+    """
+    Valida un lote de filas crudas (normalizando todos los RUT de una vez) y
+    devuelve (línea, valores) de las válidas; las inválidas quedan en el reporte
+    """
+    normalized = normalizar_ruts([str(row.get("rut") or "") for _, row in rows])
+    valid = []
+    for (line_number, row), rut in zip(rows, normalized):
+        try:
+            name = str(row.get("name") or "").strip()
+            if not name:
+                raise ValueError("El nombre es obligatorio")
+            if rut is None:
+                raise ValueError("RUT inválido")
+            valid.append((line_number, {
+                "name": name,
+                "rut_numero": rut[0],
+                "rut_dv": rut[1],
+                "is_active": _parse_bool(row.get("is_active")),
+            }))
+        except ValueError as e:
+            report["invalid"] += 1
+            _add_error(report, line_number, row.get("rut"), str(e))
+    return valid
+
+
+async def _insert_batch(db: AsyncSession, batch: List[tuple], report: Dict[str, Any]) -> None:
+    """
+    Inserta un lote en una sola sentencia multi-fila; los RUT ya existentes
+    se descartan con ON CONFLICT DO NOTHING en vez de fallar la transacción
+    """
+    if not batch:
+        return
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    statement = (
+        insert(TenantModel)
+        .values([values for _, values in batch])
+        .on_conflict_do_nothing(index_elements=["rut_numero"])
+        .returning(*TenantModel.__table__.columns)
+    )
+    created = (await db.execute(statement)).mappings().all()
+    # El INSERT por sentencia no pasa por el flush: la auditoría se registra con las filas devueltas
+    record_inserted_rows(db, TenantModel, created)
+    if created:
+        await bump_collection_version(db, "tenants")
+    await db.commit()
+    inserted = {row["rut_numero"] for row in created}
+
+    seen = set()
+    for line_number, values in batch:
+        numero = values["rut_numero"]
+        if numero in inserted and numero not in seen:
+            report["created"] += 1
+        else:
+            report["duplicates"] += 1
+            _add_error(report, line_number, formatear_rut(numero, values["rut_dv"]), "Ya existe un tenant con este RUT")
+        seen.add(numero)
+
+
+def _add_error(report: Dict[str, Any], line_number: int, rut: Optional[str], detail: str) -> None:
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line_number, "rut": rut, "detail": detail})
+
+
+async def import_tenants(db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str) -> Dict[str, Any]:
+    """
+    Importa tenants desde un stream CSV o NDJSON en lotes de BATCH_SIZE filas
+    """
+    report = {"processed": 0, "created": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    rows: List[tuple] = []
+
+    async for line_number, row in iter_rows(iter_lines(chunks), fmt):
+        report["processed"] += 1
+        if isinstance(row, str):
+            report["invalid"] += 1
+            _add_error(report, line_number, None, row)
+            continue
+
+        rows.append((line_number, row))
+        if len(rows) >= BATCH_SIZE:
+            await _insert_batch(db, validate_batch(rows, report), report)
+            rows = []
+
+    if rows:
+        await _insert_batch(db, validate_batch(rows, report), report)
+    return report
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Benchmark de carga y latencia de la API, en proceso: levanta la app real
+contra una base local y la ejercita con un cliente ASGI (httpx), sin red.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_api                                  # SQLite temporal
+    python -m benchmarks.bench_api --database-url postgresql://...  # Postgres local
+    python -m benchmarks.bench_api --scenarios me_polling tenant_list --concurrency 50 \\
+        --requests 2000 --output bench_api.json --baseline baseline.json
+
+Escribe p50/p95/p99 y throughput por escenario en --output (JSON). Con
+--baseline compara el p95 contra una corrida anterior y termina con código
+1 si algún escenario empeora más que --max-regression.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import count
+from typing import Any, Callable, Dict, List
+
+SCENARIOS = ("login_storm", "me_polling", "tenant_list", "tenant_create")
+ADMIN_EMAIL = "bench-admin@example.com"
+ADMIN_PASSWORD = "bench-password"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark en proceso de la API")
+    parser.add_argument("--database-url", help="URL de la base (por defecto SQLite temporal)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="Requests por escenario")
+    parser.add_argument("--login-requests", type=int, default=50, help="Requests del escenario login_storm")
+    parser.add_argument("--seed-tenants", type=int, default=1000)
+    parser.add_argument("--output", default="bench_api.json")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Empeoramiento tolerado del p95 (0.2 = 20%%)")
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace) -> str:
+    """
+    La configuración se lee al importar app.core.config, así que el entorno
+    se prepara antes de importar la app
+    """
+    database_url = args.database_url
+    if not database_url:
+        handle, path = tempfile.mkstemp(prefix="bench_api_", suffix=".db")
+        os.close(handle)
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ["FIRST_SUPERADMIN_EMAIL"] = ADMIN_EMAIL
+    os.environ["FIRST_SUPERADMIN_PASSWORD"] = ADMIN_PASSWORD
+    os.environ.setdefault("ENVIRONMENT", "benchmark")
+    # Todos los requests vienen de la misma IP: login_storm mide el login, no el límite de intentos
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+    return database_url
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def rut_for(number: int) -> str:
+    from app.schemas.tenant import calcular_dv
+    return f"{number}-{calcular_dv(number)}"
+
+
+async def run_scenario(
+    name: str,
+    make_request: Callable[[int], Any],
+    total: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = count()
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            started = time.perf_counter()
+            try:
+                response = await make_request(i)
+                statuses[str(response.status_code)] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = lambda value: round(value * 1000, 3)
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": to_ms(percentile(latencies, 50)),
+            "p95": to_ms(percentile(latencies, 95)),
+            "p99": to_ms(percentile(latencies, 99)),
+            "max": to_ms(latencies[-1]) if latencies else 0.0,
+        },
+        "status_codes": dict(statuses),
+    }
+
+
+async def run(args: argparse.Namespace, database_url: str) -> Dict[str, Any]:
+    import httpx
+
+    from app.core.config import settings
+    from app.main import app
+
+    api = settings.API_V1_STR
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post(f"{api}/auth/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            if args.seed_tenants:
+                base = 70_000_000 + int(time.time()) % 1_000_000 * 10
+                csv_body = "name,rut\n" + "\n".join(
+                    f"Bench {n},{rut_for(base + n)}" for n in range(args.seed_tenants)
+                )
+                await client.post(
+                    f"{api}/tenants/import",
+                    content=csv_body.encode(),
+                    headers={**headers, "content-type": "text/csv"},
+                )
+
+            create_base = 80_000_000 + int(time.time()) % 1_000_000 * 10
+            requests = {
+                "login_storm": (
+                    lambda i: client.post(f"{api}/auth/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD}),
+                    args.login_requests,
+                ),
+                "me_polling": (lambda i: client.get(f"{api}/auth/me", headers=headers), args.requests),
+                "tenant_list": (lambda i: client.get(f"{api}/tenants/", params={"limit": 50}, headers=headers), args.requests),
+                "tenant_create": (
+                    lambda i: client.post(
+                        f"{api}/tenants/",
+                        json={"name": f"Bench create {i}", "rut": rut_for(create_base + i)},
+                        headers=headers,
+                    ),
+                    args.requests,
+                ),
+            }
+
+            results = {}
+            for name in args.scenarios:
+                make_request, total = requests[name]
+                results[name] = await run_scenario(name, make_request, total, args.concurrency)
+                latency = results[name]["latency_ms"]
+                print(
+                    f"{name:<14} {results[name]['throughput_rps']:>9.1f} req/s  "
+                    f"p50={latency['p50']:.2f}ms p95={latency['p95']:.2f}ms p99={latency['p99']:.2f}ms  "
+                    f"{results[name]['status_codes']}"
+                )
+    finally:
+        await app.router.shutdown()
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "database": database_url.split(":", 1)[0],
+        "scenarios": results,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(report: Dict[str, Any], baseline_path: str, max_regression: float) -> bool:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    ok = True
+    for name, result in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        before, after = previous["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (after - before) / before if before else 0.0
+        flag = "REGRESIÓN" if change > max_regression else "ok"
+        print(f"{name:<14} p95 {before:.2f}ms -> {after:.2f}ms ({change:+.1%}) {flag}")
+        ok = ok and change <= max_regression
+    return ok
+
+
+def main() -> None:
+    args = parse_args()
+    database_url = configure_environment(args)
+    report = asyncio.run(run(args, database_url))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados en {args.output}")
+
+    if not args.database_url:
+        os.remove(database_url[len("sqlite:///"):])
+
+    if args.baseline and not compare(report, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
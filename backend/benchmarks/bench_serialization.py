@@ -0,0 +1,96 @@
+"""
+Compara la serialización del listado de tenants: camino actual (modelos ORM
++ validación/serialización Pydantic de response_model + json) contra el
+camino rápido (columnas como tuplas + orjson).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization [--sizes 100 1000 10000] [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import time
+
+# Base SQLite en memoria: el benchmark no necesita la configuración real
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("FIRST_SUPERADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("FIRST_SUPERADMIN_PASSWORD", "benchmark")
+
+from typing import List
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.tenant import Tenant as TenantModel
+from app.routers.tenants import TENANT_LIST_COLUMNS, _fast_tenant_list
+from app.schemas.tenant import Tenant, calcular_dv
+
+tenant_list_adapter = TypeAdapter(List[Tenant])
+
+
+def seed(session: Session, rows: int) -> None:
+    session.execute(delete(TenantModel))
+    session.execute(insert(TenantModel), [
+        {
+            "name": f"Empresa {n}",
+            "rut_numero": 10_000_000 + n,
+            "rut_dv": calcular_dv(10_000_000 + n),
+            "is_active": n % 2 == 0,
+        }
+        for n in range(rows)
+    ])
+    session.commit()
+
+
+def current_path(session: Session, limit: int) -> bytes:
+    tenants = session.execute(select(TenantModel).limit(limit)).scalars().all()
+    # Equivalente a lo que hace FastAPI con response_model=List[Tenant]
+    value = tenant_list_adapter.validate_python(tenants, from_attributes=True)
+    content = tenant_list_adapter.dump_python(value, mode="json")
+    body = JSONResponse(content).body
+    session.expunge_all()
+    return body
+
+
+def fast_path(session: Session, limit: int) -> bytes:
+    rows = session.execute(select(*TENANT_LIST_COLUMNS).limit(limit)).all()
+    return _fast_tenant_list(rows, Response()).body
+
+
+def measure(fn, session: Session, limit: int, repeat: int) -> float:
+    fn(session, limit)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(session, limit)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+
+    print(f"{'filas':>8} {'actual (ms)':>12} {'rápido (ms)':>12} {'speedup':>8}")
+    with Session(engine) as session:
+        for size in args.sizes:
+            seed(session, size)
+            assert current_path(session, size) == fast_path(session, size), "Los bodies difieren"
+            current = measure(current_path, session, size, args.repeat)
+            fast = measure(fast_path, session, size, args.repeat)
+            print(f"{size:>8} {current:>12.2f} {fast:>12.2f} {current / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
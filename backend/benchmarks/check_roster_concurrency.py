@@ -0,0 +1,153 @@
+"""
+Prueba de concurrencia de la pauta: varios PATCH /roster simultáneos sobre
+las mismas celdas (en la misma instalación y moviendo turnos entre dos
+instalaciones) y al final compara el índice de cobertura con un recálculo
+desde shifts (coverage.check).
+
+Uso (desde backend/):
+    python -m benchmarks.check_roster_concurrency                                  # SQLite temporal
+    python -m benchmarks.check_roster_concurrency --database-url postgresql://...  # Postgres local
+
+Termina con código 1 si el índice quedó descuadrado.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+
+ADMIN_EMAIL = "roster-admin@example.com"
+ADMIN_PASSWORD = "roster-password"
+SHIFT_TYPES = ("dia", "noche", "libre", None)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrencia de guardados de pauta")
+    parser.add_argument("--database-url", help="URL de la base (por defecto SQLite temporal)")
+    parser.add_argument("--guards", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=20, help="Rondas de PATCH simultáneos")
+    parser.add_argument("--concurrency", type=int, default=8, help="PATCH simultáneos por ronda")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def configure_environment(args: argparse.Namespace) -> str:
+    database_url = args.database_url
+    if not database_url:
+        handle, path = tempfile.mkstemp(prefix="roster_concurrency_", suffix=".db")
+        os.close(handle)
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "roster-concurrency")
+    os.environ["FIRST_SUPERADMIN_EMAIL"] = ADMIN_EMAIL
+    os.environ["FIRST_SUPERADMIN_PASSWORD"] = ADMIN_PASSWORD
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "False")
+    return database_url
+
+
+async def run(args: argparse.Namespace) -> int:
+    import httpx
+    from sqlalchemy import insert
+
+    from app.core.config import settings
+    from app.db.session import AsyncSessionLocal
+    from app.main import app
+    from app.models.shift import Shift, ShiftType
+    from app.schemas.tenant import calcular_dv
+    from app.services import coverage
+
+    api = settings.API_V1_STR
+    rng = random.Random(args.seed)
+    year, month = 2030, 1
+    base = 60_000_000 + int(time.time()) % 1_000_000 * 10
+    rut = lambda number: f"{number}-{calcular_dv(number)}"
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://roster", timeout=60) as client:
+            response = await client.post(f"{api}/auth/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            tenant = (await client.post(
+                f"{api}/tenants/", json={"name": "Concurrencia", "rut": rut(base)}, headers=headers
+            )).json()
+            installations = [
+                (await client.post(
+                    f"{api}/installations/",
+                    json={"tenant_id": tenant["id"], "name": f"Instalación {n}", "required_guards": 2},
+                    headers=headers,
+                )).json()["id"]
+                for n in range(2)
+            ]
+            guard_ids = [
+                (await client.post(
+                    f"{api}/guards/",
+                    json={
+                        "tenant_id": tenant["id"], "installation_id": installations[0],
+                        "nombre": f"Guardia {n}", "apellido": "Concurrencia", "rut": rut(base + 1 + n),
+                    },
+                    headers=headers,
+                )).json()["id"]
+                for n in range(args.guards)
+            ]
+            # Un turno de cada guardia en la segunda instalación, para que su pauta también los incluya
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(Shift), [
+                    {
+                        "tenant_id": tenant["id"], "installation_id": installations[1], "guard_id": guard_id,
+                        "date": date(year, month, 31), "shift_type": ShiftType.LIBRE,
+                    }
+                    for guard_id in guard_ids
+                ])
+                await db.commit()
+
+            statuses: Counter = Counter()
+
+            async def patch():
+                # Pocos días y guardias: los PATCH de una ronda chocan en las mismas celdas
+                start = rng.randint(1, 5)
+                operation = {
+                    "op": "assign",
+                    "guard_ids": rng.sample(guard_ids, rng.randint(1, min(3, len(guard_ids)))),
+                    "start": date(year, month, start).isoformat(),
+                    "end": date(year, month, start + rng.randint(0, 3)).isoformat(),
+                    "shift_type": rng.choice(SHIFT_TYPES),
+                }
+                response = await client.patch(
+                    f"{api}/installations/{rng.choice(installations)}/roster",
+                    params={"year": year, "month": month},
+                    json={"operations": [operation]},
+                    headers=headers,
+                )
+                statuses[str(response.status_code)] += 1
+
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                await asyncio.gather(*(patch() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await app.router.shutdown()
+
+    async with AsyncSessionLocal() as db:
+        mismatches = await coverage.check(db, tenant["id"])
+    print(f"{args.rounds * args.concurrency} PATCH en {elapsed:.2f}s  {dict(statuses)}")
+    for line in mismatches:
+        print(line)
+    print(f"{len(mismatches)} diferencias en el índice de cobertura")
+    return 1 if mismatches or set(statuses) != {"200"} else 0
+
+
+def main() -> None:
+    args = parse_args()
+    configure_environment(args)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file